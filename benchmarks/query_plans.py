@@ -0,0 +1,132 @@
+"""
+Prints the query plans of the hot lookups of the resource_planning module.
+
+Run it in an odoo shell on a database with the module installed:
+
+    odoo-bin shell -d <database> < benchmarks/query_plans.py
+
+Run it once before and once after updating the module to compare the plans.
+Every lookup has a query for the schema before the update (version 1.0, without employee_week_load)
+and one for the schema after the update. The script detects the schema and runs the matching queries.
+The queries before the update are the SQL the ORM runs for the lookups of version 1.0.
+With SEED set to True, it first creates SEED_EMPLOYEES employees with SEED_RESOURCES
+resources each, so the plans reflect a realistic table size. The transaction is rolled back
+at the end, so the database is left as it was.
+
+"""
+import datetime
+import time
+
+SEED = True
+SEED_EMPLOYEES = 200
+SEED_RESOURCES = 10
+
+# name: (query before the update, query after the update)
+QUERIES = {
+    # weekly_resource.model search of the weeks of a resource (Resource.get_weekly_resources_in)
+    'weekly_resources of a resource': ("""
+        SELECT id FROM weekly_resource_model
+        WHERE resource_id IN %(resource_ids)s AND week_id IN %(week_ids)s
+    """, """
+        SELECT id FROM weekly_resource_model
+        WHERE resource_id IN %(resource_ids)s AND week_id IN %(week_ids)s
+    """),
+    # capacity check of a booking: Employee.compute_total_workload walked all weekly_resources of the employee,
+    # now the stored total workloads are looked up (EmployeeWeekLoad.get_total_workloads)
+    'total workloads of an employee': ("""
+        SELECT wr.week_id, SUM(wr.weekly_workload)
+        FROM weekly_resource_model wr
+        JOIN resource_model r ON r.id = wr.resource_id
+        WHERE r.employee IN %(employee_id_tuple)s AND wr.week_id IN %(week_ids)s
+        GROUP BY wr.week_id
+    """, """
+        SELECT employee_id, week_id, total_workload
+        FROM employee_week_load
+        WHERE employee_id IN %(employee_id_tuple)s AND week_id IN %(week_ids)s
+    """),
+    # report data: the weekly_resources were searched per project and employee,
+    # now they are aggregated by a read_group (ReportView._get_report_values)
+    'report data': ("""
+        SELECT wr.id
+        FROM weekly_resource_model wr
+        JOIN resource_model r ON r.id = wr.resource_id
+        WHERE r.project = %(project_id)s AND r.employee = %(employee_id)s
+    """, """
+        SELECT ww.project_id, ww.employee_id, ww.week_id, SUM(ww.weekly_workload)
+        FROM weekly_workload_model ww
+        WHERE ww.week_id IN %(week_ids)s
+        GROUP BY ww.project_id, ww.employee_id, ww.week_id
+    """),
+    # weeks of the report (ReportWizard.get_weeks): all weeks were read and compared by their week_string
+    'weeks in a range': ("""
+        SELECT id, week_string FROM week_model
+    """, """
+        SELECT id FROM week_model
+        WHERE yearweek BETWEEN %(start_yearweek)s AND %(end_yearweek)s
+    """),
+}
+
+
+def is_updated(env):
+    """
+    :param env: the odoo environment of the shell
+    :return: True if the database has the schema after the update (employee_week_load exists)
+    """
+    env.cr.execute("SELECT to_regclass('employee_week_load') IS NOT NULL")
+    return env.cr.fetchone()[0]
+
+
+def seed(env):
+    """
+    Creates the employees and resources used to benchmark the queries.
+    The resources are created one by one, as version 1.0 only creates one resource at a time.
+
+    :param env: the odoo environment of the shell
+    """
+    project = env['project.project'].create({'name': 'Benchmark'})
+    start = datetime.datetime(2020, 1, 6)
+
+    begin = time.time()
+    for i in range(SEED_EMPLOYEES):
+        employee = env['hr.employee'].create({'name': 'Benchmark %s' % i})
+        for j in range(SEED_RESOURCES):
+            env['resource.model'].create({'project': project.id,
+                                          'employee': employee.id,
+                                          'base_workload': 100 // SEED_RESOURCES,
+                                          'start_date': start + datetime.timedelta(weeks=j * 4),
+                                          'end_date': start + datetime.timedelta(weeks=j * 4 + 30)})
+    env['resource.model'].flush()
+    print("Created %s resources in %.2f s" % (SEED_EMPLOYEES * SEED_RESOURCES, time.time() - begin))
+
+
+def explain(env):
+    """
+    Prints the plan and the execution time of all queries matching the schema of the database
+
+    :param env: the odoo environment of the shell
+    """
+    updated = is_updated(env)
+    print("Schema %s the update" % ("after" if updated else "before"))
+
+    weekly_resource = env['weekly_resource.model'].search([], limit=1, order='id desc')
+    resource = weekly_resource.resource_id
+    week_ids = tuple(resource.weekly_resources.mapped('week_id').ids)
+    params = {'resource_ids': (resource.id,),
+              'week_ids': week_ids,
+              'employee_id_tuple': (resource.employee.id,),
+              'employee_id': resource.employee.id,
+              'project_id': resource.project.id,
+              'start_yearweek': 202001,
+              'end_yearweek': 202052}
+
+    for name, queries in QUERIES.items():
+        env.cr.execute("EXPLAIN (ANALYZE, BUFFERS) " + queries[1 if updated else 0], params)
+        print("\n-- %s" % name)
+        for row in env.cr.fetchall():
+            print(row[0])
+
+
+if SEED:
+    seed(env)
+explain(env)
+env.cr.rollback()
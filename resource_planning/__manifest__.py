@@ -19,7 +19,7 @@
     # Check https://github.com/odoo/odoo/blob/13.0/odoo/addons/base/data/ir_module_category_data.xml
     # for the full list
     'category': 'Tools',
-    'version': '1.0',
+    'version': '1.1',
 
     # any module necessary for this one to work correctly
     'depends': [
@@ -35,8 +35,10 @@
         'views/resource_tree.xml',
         'views/weekly_resource.xml',
         'views/weekly_resource_project.xml',
+        'views/weekly_workload.xml',
         'views/res_config_settings_views.xml',
-        'data/default_settings.xml'
+        'data/default_settings.xml',
+        'data/ir_cron.xml'
     ],
     # only loaded in demonstration mode
     'demo': [],
@@ -0,0 +1,26 @@
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """
+    Deletes the duplicate weekly_resources of a resource in a week before the constraint resource_week_unique
+    is added, otherwise the constraint can't be created.
+    Of every duplicate, the manually changed weekly_resource (or the oldest one) is kept.
+
+    :param cr: the cursor of the database
+    :param version: the installed version of the module
+    """
+    if not version:
+        return
+
+    cr.execute("""
+        DELETE FROM weekly_resource_model wr
+        USING (SELECT id, row_number() OVER (PARTITION BY resource_id, week_id
+                                             ORDER BY COALESCE(manually_changed, FALSE) DESC, id) AS rank
+               FROM weekly_resource_model) AS duplicate
+        WHERE wr.id = duplicate.id AND duplicate.rank > 1
+    """)
+    if cr.rowcount:
+        _logger.info("Deleted %s duplicate weekly_resources", cr.rowcount)
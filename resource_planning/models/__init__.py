@@ -5,3 +5,5 @@ from . import resource
 from . import weeks
 from . import weekly_resource
 from . import res_config_settings
+from . import weekly_workload
+from . import employee_week_load
@@ -19,10 +19,26 @@ class Employee(models.Model):
         :param week: week model of the desired week
         :return: employee's total workload during that week
         """
-        total_workload = 0
-        for resource in self.resources:
-            for weekly_resource in resource.weekly_resources:
-                if weekly_resource.week_id == week:
-                    total_workload += weekly_resource.weekly_workload
+        return self.compute_total_workload_range(week).get(week.id, 0)
 
-        return total_workload
+    def compute_total_workload_range(self, weeks):
+        """
+        Computes the total workload assigned to the employee in each of the given weeks
+
+        :param weeks: week models of the desired weeks
+        :return: dict {week_id: total workload} containing all given weeks
+        """
+        self.ensure_one()
+        total_workloads = self.compute_total_workloads(weeks)
+
+        return {week.id: total_workloads.get((self.id, week.id), 0) for week in weeks}
+
+    def compute_total_workloads(self, weeks):
+        """
+        Looks up the total workloads of all employees in self in the given weeks
+        from the stored total workloads (employee.week.load)
+
+        :param weeks: week models of the desired weeks
+        :return: dict {(employee_id, week_id): total workload}, missing keys have a total workload of 0
+        """
+        return self.env['employee.week.load'].get_total_workloads(self, weeks)
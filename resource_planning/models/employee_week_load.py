@@ -0,0 +1,221 @@
+import logging
+from contextlib import contextmanager
+
+from odoo import models, fields, api, exceptions
+
+_logger = logging.getLogger(__name__)
+
+# time a transaction waits for the lock of an employee before it is retried
+LOCK_TIMEOUT = '2s'
+
+
+class EmployeeWeekLoad(models.Model):
+    """
+    Stores the total workload of an employee in a week.
+    Kept up to date by the weekly_resource.model and the resource.model whenever a weekly_resource is
+    created, changed or deleted (or the timespan of a resource is changed in the sparse mode),
+    so the total workload of an employee in a week can be looked up instead of being summed up
+    over all of the employee's weekly workloads (weekly_workload.model).
+
+    The database rejects total workloads larger than 100, unless they are flagged as overloaded.
+    Only the rebuild stores such workloads, if the weekly workloads were already too high before.
+
+    Checking and storing the total workloads of an employee is serialized by an advisory lock per employee,
+    so concurrent planners can't both book the last free capacity of the same employee.
+    A planner who tries to book an employee while another one holds the lock waits for at most LOCK_TIMEOUT,
+    then the request is retried by Odoo.
+
+    Bulk operations which are over 100 % in between (e.g. swapping two allocations) can be run
+    inside defer_capacity_check, which checks all touched weeks once at the end.
+
+    """
+    _name = "employee.week.load"
+    _description = "Employee Week Load"
+
+    employee_id = fields.Many2one('hr.employee', 'Employee', required=True, ondelete="cascade")
+    week_id = fields.Many2one('week.model', 'Week', required=True, ondelete="cascade")
+    total_workload = fields.Integer(string='Total Workload %')
+    overloaded = fields.Boolean(string='Overloaded', default=False)
+
+    _sql_constraints = [
+        ('employee_week_unique', 'UNIQUE(employee_id, week_id)', 'Something went wrong, please try again'),
+        ('total_workload_max', 'CHECK(total_workload <= 100 OR overloaded)',
+         "The total workload can't be larger than 100 %"),
+    ]
+
+    def init(self):
+        """
+        Rebuilds the total workloads when the module is installed or updated.
+
+        """
+        self.rebuild_total_workloads()
+
+    @api.model
+    def rebuild_total_workloads(self):
+        """
+        Replaces the stored total workloads of all employees by the sums of their weekly workloads.
+        Rows of employees and weeks without weekly workloads anymore are deleted.
+        Total workloads which are already larger than 100 are stored as they are and flagged as overloaded.
+
+        """
+        self.env.cr.execute("DELETE FROM employee_week_load")
+        self.env.cr.execute("""
+            INSERT INTO employee_week_load (employee_id, week_id, total_workload, overloaded,
+                                            create_uid, create_date, write_uid, write_date)
+            SELECT ww.employee_id, ww.week_id, SUM(ww.weekly_workload), SUM(ww.weekly_workload) > 100,
+                   %s, (now() at time zone 'UTC'), %s, (now() at time zone 'UTC')
+            FROM weekly_workload_model ww
+            GROUP BY ww.employee_id, ww.week_id
+            RETURNING overloaded
+        """, [self.env.uid, self.env.uid])
+
+        overloaded = len([row for row in self.env.cr.fetchall() if row[0]])
+        if overloaded:
+            _logger.warning("The total workload of %s employee week(s) is larger than 100 %%", overloaded)
+        self.invalidate_cache()
+
+    @api.model
+    def get_total_workloads(self, employees, weeks):
+        """
+        Looks up the total workloads of the employees in the weeks
+
+        :param employees: the employee models
+        :param weeks: the week models
+        :return: dict {(employee_id, week_id): total workload}, missing keys have a total workload of 0
+        """
+        if not employees or not weeks:
+            return {}
+
+        self.env.cr.execute("""
+            SELECT employee_id, week_id, total_workload
+            FROM employee_week_load
+            WHERE employee_id IN %s AND week_id IN %s
+        """, [tuple(employees.ids), tuple(weeks.ids)])
+
+        return {(employee_id, week_id): total for employee_id, week_id, total in self.env.cr.fetchall()}
+
+    @api.model
+    @contextmanager
+    def defer_capacity_check(self):
+        """
+        Collects the employees and weeks whose total workload changes inside the with block
+        and checks and stores all of them once at the end of the block.
+        Operations have to run with the yielded environment, e.g.
+
+            with self.env['employee.week.load'].defer_capacity_check() as env:
+                resources.with_env(env).write({'employee': employee.id})
+
+        Inside the block the stored total workloads are not updated and the workloads are not checked.
+        Nested blocks are checked by the outermost one.
+
+        :raises:
+            :exception ValidationError: listing all weeks in which the total workload of an employee
+                                        is larger than 100 at the end of the block
+        """
+        if self.env.context.get('deferred_week_load_keys') is not None:
+            yield self.env
+            return
+
+        keys = set()
+        yield self.with_context(deferred_week_load_keys=keys).env
+
+        self.refresh_total_workloads(keys, all_weeks=True)
+
+    @api.model
+    def is_capacity_check_deferred(self):
+        """
+        :return: True if called inside defer_capacity_check
+        """
+        return self.env.context.get('deferred_week_load_keys') is not None
+
+    @api.model
+    def lock_employees(self, employee_ids):
+        """
+        Takes a transaction-scoped advisory lock for each of the employees, in the order of their ids.
+        The lock is taken in the middle of the transaction, after its REPEATABLE READ snapshot exists.
+        If another transaction holds one of the locks for longer than LOCK_TIMEOUT, the lock raises
+        LockNotAvailable, which aborts the transaction and lets Odoo retry the whole request with a new snapshot.
+        Transactions booking different employees never block each other.
+
+        :param employee_ids: ids of the employees whose workloads are checked and stored
+        :raises:
+            :exception LockNotAvailable: if another transaction is booking one of the employees at the same time
+        """
+        employee_ids = sorted(set(employee_id for employee_id in employee_ids if employee_id))
+        if not employee_ids:
+            return
+
+        self.env.cr.execute("SELECT current_setting('lock_timeout')")
+        lock_timeout = self.env.cr.fetchone()[0]
+        self.env.cr.execute("SELECT set_config('lock_timeout', %s, true)", [LOCK_TIMEOUT])
+        self.env.cr.execute("""
+            SELECT pg_advisory_xact_lock('employee_week_load'::regclass::oid::int, e.employee_id)
+            FROM unnest(%s::int[]) AS e(employee_id)
+        """, [employee_ids])
+        # only reached if the locks were granted, a failed lock rolls the setting back with the transaction
+        self.env.cr.execute("SELECT set_config('lock_timeout', %s, true)", [lock_timeout])
+
+    @api.model
+    def refresh_total_workloads(self, keys, all_weeks=False):
+        """
+        Recomputes the stored total workloads of the given employees and weeks from their weekly workloads.
+        Called whenever weekly_resources are created, changed or deleted.
+        Inside defer_capacity_check, the keys are only collected.
+
+        :param keys: set of (employee_id, week_id) tuples whose total workload may have changed
+        :param all_weeks: whether the error lists all weeks with a too high workload or only the first one
+        :raises:
+            :exception ValidationError: if the total workload of an employee in a week is larger than 100
+        """
+        keys = list(set(key for key in keys if key[0] and key[1]))
+        if not keys:
+            return
+
+        if self.is_capacity_check_deferred():
+            self.env.context['deferred_week_load_keys'].update(keys)
+            return
+
+        self.lock_employees([key[0] for key in keys])
+
+        with self.env.cr.savepoint():
+            # pending changes are written inside the savepoint, so they are undone if the workload is too high
+            self.env['weekly_resource.model'].flush(['resource_id', 'week_id', 'weekly_workload'])
+            self.env['resource.model'].flush(['employee', 'start_date', 'end_date', 'base_workload'])
+
+            self.env.cr.execute("""
+                SELECT k.employee_id, k.week_id,
+                       (SELECT COALESCE(SUM(ww.weekly_workload), 0)
+                        FROM weekly_workload_model ww
+                        WHERE ww.employee_id = k.employee_id AND ww.week_id = k.week_id)
+                FROM unnest(%s::int[], %s::int[]) AS k(employee_id, week_id)
+            """, [[key[0] for key in keys], [key[1] for key in keys]])
+            totals = self.env.cr.fetchall()
+
+            too_high = self.env['week.model'].browse(set(week_id for employee_id, week_id, total in totals
+                                                         if total > 100))
+            if too_high:
+                weeks = too_high.sorted('yearweek')
+                if not all_weeks or len(weeks) == 1:
+                    raise exceptions.ValidationError("The workload in week " + weeks[0].week_string + " is too high")
+                raise exceptions.ValidationError("The workload in the weeks " + "; ".join(weeks.mapped('week_string'))
+                                                 + " is too high")
+
+            rows = []
+            params = []
+            for employee_id, week_id, total in totals:
+                rows.append("(%s, %s, %s, FALSE, %s, (now() at time zone 'UTC'), %s, (now() at time zone 'UTC'))")
+                params.extend([employee_id, week_id, total, self.env.uid, self.env.uid])
+
+            # the checked totals are at most 100, so an overloaded week is not overloaded anymore
+            self.env.cr.execute("""
+                INSERT INTO employee_week_load (employee_id, week_id, total_workload, overloaded,
+                                                create_uid, create_date, write_uid, write_date)
+                VALUES {}
+                ON CONFLICT (employee_id, week_id) DO UPDATE
+                SET total_workload = EXCLUDED.total_workload,
+                    overloaded = EXCLUDED.overloaded,
+                    write_uid = EXCLUDED.write_uid,
+                    write_date = EXCLUDED.write_date
+            """.format(", ".join(rows)), params)
+
+        self.invalidate_cache(['total_workload', 'overloaded'])
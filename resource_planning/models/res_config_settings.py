@@ -6,23 +6,36 @@ class ResConfigSettings(models.TransientModel):
     Extends res.config.settings to store module-specific parameters from settings page.
     The variable filter_weeks is used to change the duration of the filter "custom timespan" in the Overview of
     weekly_resource models.
+    The variables calendar_years_ahead and calendar_years_back define the timespan for which the weeks are
+    created in advance by the scheduled action.
+    The variable sparse_weekly_resources defines whether only the manually changed weekly_resources are stored.
     """
 
     _inherit = 'res.config.settings'
 
     filter_weeks = fields.Integer(string="Weeks Filter")
+    calendar_years_ahead = fields.Integer(string="Years Ahead")
+    calendar_years_back = fields.Integer(string="Years Back")
+    sparse_weekly_resources = fields.Boolean(string="Store Changed Weeks Only")
 
     def set_values(self):
         """
         Stores the parameters in the ir.config_parameter model where they can be easily accessed.
-        Calls the set_weekdelta_week and triggers the is_week_in_period method of week.model.
+        The week_bool of the week models is computed when it is read or searched,
+        so no week has to be updated.
+        If the sparse mode is switched off, the derived weeks are stored as weekly_resources first,
+        so the resources keep all their weeks.
 
         :return: the created ResConfigSettings Object
         """
         res = super(ResConfigSettings, self).set_values()
         self.env['ir.config_parameter'].set_param('resource_planning.filter_weeks', self.filter_weeks)
-
-        self.set_weekdelta_week()
+        self.env['ir.config_parameter'].set_param('resource_planning.calendar_years_ahead', self.calendar_years_ahead)
+        self.env['ir.config_parameter'].set_param('resource_planning.calendar_years_back', self.calendar_years_back)
+        if self.env['weekly_workload.model'].is_sparse_mode() and not self.sparse_weekly_resources:
+            self.env['weekly_workload.model'].store_derived_weeks()
+        self.env['ir.config_parameter'].set_param('resource_planning.sparse_weekly_resources',
+                                                  self.sparse_weekly_resources)
 
         return res
 
@@ -37,19 +50,13 @@ class ResConfigSettings(models.TransientModel):
         res = super(ResConfigSettings, self).get_values()
         ICPSudo = self.env['ir.config_parameter'].sudo()
         filter_weeks = ICPSudo.get_param('resource_planning.filter_weeks')
+        calendar_years_ahead = ICPSudo.get_param('resource_planning.calendar_years_ahead', 0)
+        calendar_years_back = ICPSudo.get_param('resource_planning.calendar_years_back', 0)
+        sparse_weekly_resources = ICPSudo.get_param('resource_planning.sparse_weekly_resources')
         res.update(
-            filter_weeks=int(filter_weeks)
+            filter_weeks=int(filter_weeks),
+            calendar_years_ahead=int(calendar_years_ahead),
+            calendar_years_back=int(calendar_years_back),
+            sparse_weekly_resources=sparse_weekly_resources == 'True'
         )
         return res
-
-    def set_weekdelta_week(self):
-        """
-        Triggers the is_week_in_period method of the week models to (re-)set the week_bool
-        every time the filter_weeks (duration) was changed through the settings page.
-
-        """
-
-        weeks = self.env['week.model'].search([])
-
-        for week in weeks:
-            week.is_week_in_period()
@@ -1,25 +1,17 @@
-from odoo import models, fields, api, exceptions
+from odoo import models, fields, api, exceptions, tools
 import datetime
 
-
-def get_week(date):
-    """
-    Returns the year and week of a given date as Integer in
-    the format YYYYWW  (Y Year, W Week)
-
-    :param date:
-    :return: year and week: YYYYWW
-    """
-    year = date.isocalendar()[0]
-    week = date.isocalendar()[1]
-    return year * 100 + week
-
+from .weeks import compute_week_data, get_week, merge_week_data
 
 
 class Resource(models.Model):
     """
     A class to assign employees a workload for a period of time in a project.
 
+    In the default mode, a weekly_resource is stored for every week of the timespan.
+    In the sparse mode (set on the settings page), only the manually changed weekly_resources are stored,
+    the workloads of the other weeks are derived from the timespan and the base_workload (weekly_workload.model).
+
     """
     _name = "resource.model"
     _description = "Resource"
@@ -35,25 +27,51 @@ class Resource(models.Model):
     weeks_to_be_added = fields.Integer(default=0, readonly="1",
                                        help='Weeks to be added or subtracted to/from current resource, changing the end date')
 
+    def init(self):
+        """
+        Creates the index used to find the resources of an employee overlapping a timespan
+
+        """
+        tools.create_index(self.env.cr, 'resource_model_employee_dates_index',
+                           self._table, ['employee', 'start_date', 'end_date'])
+
     @api.depends('weeks_to_be_added')
     def plus_one_week(self):
         """
         Sets end date one week later leaves start date as it was
+        Only the weekly_resource of the added week is created and only that week's workload is checked.
 
         :returns date for end_date that will be set/updated
         """
-        self.end_date = self.end_date + datetime.timedelta(days=7)
-        self.weeks_to_be_added = self.weeks_to_be_added + 1
+        self.shift_end_date(1)
 
     @api.depends('weeks_to_be_added')
     def minus_one_week(self):
         """
         Sets end date one week earlier leaves start date as it was
+        Only the weekly_resource of the removed week is deleted.
 
         :returns date for end_date that will be set/updated
         """
-        self.end_date = self.end_date - datetime.timedelta(days=7)
-        self.weeks_to_be_added = self.weeks_to_be_added - 1
+        self.shift_end_date(-1)
+
+    def shift_end_date(self, weeks):
+        """
+        Moves the end date by the given number of weeks and updates weeks_to_be_added.
+        Bypasses the regeneration in write and only creates or deletes the weekly_resources
+        of the weeks between the old and the new end date.
+        In the sparse mode, only the total workloads of these weeks are updated.
+
+        :param weeks: the number of weeks to add (positive) or subtract (negative)
+        """
+        old_end_dates = {resource.id: resource.end_date for resource in self}
+        for resource in self:
+            super(Resource, resource).write({'end_date': resource.end_date + datetime.timedelta(weeks=weeks),
+                                             'weeks_to_be_added': resource.weeks_to_be_added + weeks})
+        keys = self.update_end_dates(old_end_dates)
+
+        if self.env['weekly_workload.model'].is_sparse_mode():
+            self.env['employee.week.load'].refresh_total_workloads(keys)
 
     @api.onchange('next_week')
     def set_dates(self):
@@ -76,108 +94,287 @@ class Resource(models.Model):
         """
         Checks if start date is before or at the same date as end date
         makes sure both dates are filled out
+        All resources are checked at once.
 
         :raises:
             :exception ValidationError: if start_date > end_date or one of the dates has not been entered (is False)
         """
-        if self.start_date is False or self.end_date is False:
+        if self.filtered(lambda resource: resource.start_date is False or resource.end_date is False):
             raise exceptions.ValidationError("Both dates must be filled out")
-        if self.start_date > self.end_date:
+        if self.filtered(lambda resource: resource.start_date > resource.end_date):
             raise exceptions.ValidationError("Start date must be before end date")
 
     @api.constrains('base_workload')
     def verify_workload(self):
         """
         Checks if workload is between 0 and 100
+        All resources are checked at once.
 
         :raises:
             :exception ValidationError: if workload < 0 or workload > 100
         """
-        if self.base_workload > 100:
+        if self.filtered(lambda resource: resource.base_workload > 100):
             raise exceptions.ValidationError("The given workload can't be larger than 100 %")
-        elif self.base_workload < 0:
+        if self.filtered(lambda resource: resource.base_workload < 0):
             raise exceptions.ValidationError("The given workload can't be smaller than 0 %")
 
-    @api.model
+    @api.model_create_multi
     def create(self, values):
         """
         Constructor
         Initiates the creation corresponding models (of type Week, WeeklyResource)
+        for all created Resource objects at once
 
-        :param values: the user input to create a Resource object:
+        :param values: the user input to create one or more Resource objects:
                         an employee and a project which are assigned to each other with a workload (base_workload),
                         start_date and end_date to define the timespan of the assignment,
                         as well as some other used for some computations on the object
 
-        :return: the created Resource object
+        :return: the created Resource objects
         """
         rec = super(Resource, self).create(values)
         rec.create_corresponding_models(rec)
+
+        if self.env['weekly_workload.model'].is_sparse_mode():
+            self.env['employee.week.load'].refresh_total_workloads(rec.get_week_load_keys())
+
         return rec
 
     def write(self, values):
         """
         Overriding default write method (modifying a Resource model)
-        Calls create_corresponding_models method to delete spare and create new weekly_resources.
+        Calls create_corresponding_models method to delete spare and create new weekly_resources
+        if the start_date or the base_workload changed.
+        If only the end_date changed, only the weekly_resources of the added or removed weeks are
+        created or deleted. If none of them changed, the weekly_resources are left as they are.
+        All modified Resource models are updated together.
+        In the sparse mode, the total workloads of the old and the new timespans are updated
+        if the employee, the start_date or the base_workload changed.
+        If only the end_date changed, only the total workloads of the added or removed weeks are updated.
 
         :param values: the "new" values to be stored in the database
-        :param self: the Resource model to be modified
+        :param self: the Resource models to be modified
         :return: rec: a boolean indicating whether write has been successful or not
         :rtype: bool
         """
+        old_values = {resource.id: (resource.start_date, resource.end_date, resource.base_workload)
+                      for resource in self}
+        keys = self.weekly_resources.get_week_load_keys() if 'employee' in values else set()
+        sparse = self.env['weekly_workload.model'].is_sparse_mode()
+        whole_timespans = sparse and any(field in values for field in ('employee', 'start_date', 'base_workload'))
+        if whole_timespans:
+            keys |= self.get_week_load_keys()
+
         rec = super(Resource, self).write(values)
 
-        self.create_corresponding_models(self)
+        if keys and not sparse:
+            # the weekly_resources moved from one employee to another
+            self.env['employee.week.load'].refresh_total_workloads(keys | self.weekly_resources.get_week_load_keys())
+
+        regenerate = self.browse()
+        old_end_dates = {}
+        for resource in self:
+            start_date, end_date, base_workload = old_values[resource.id]
+            if resource.start_date != start_date or resource.base_workload != base_workload:
+                regenerate |= resource
+            elif resource.end_date != end_date:
+                old_end_dates[resource.id] = end_date
+
+        end_date_keys = set()
+        if regenerate:
+            self.create_corresponding_models(regenerate)
+        if old_end_dates:
+            end_date_keys = self.browse(list(old_end_dates)).update_end_dates(old_end_dates)
+
+        if whole_timespans:
+            # the derived weekly workloads moved with the timespans
+            self.env['employee.week.load'].refresh_total_workloads(keys | self.get_week_load_keys())
+        elif sparse:
+            # the derived weekly workloads of the weeks added or removed by moving the end_dates
+            self.env['employee.week.load'].refresh_total_workloads(end_date_keys)
+
+        return rec
+
+    def unlink(self):
+        """
+        Overriding default unlink method
+        Updates the total workloads (employee.week.load) of the weeks of the resource,
+        since its weekly_resources are deleted by the database.
+
+        :return: a boolean indicating whether unlink has been successful or not
+        """
+        keys = self.weekly_resources.get_week_load_keys()
+        if self.env['weekly_workload.model'].is_sparse_mode():
+            keys |= self.get_week_load_keys()
+        rec = super(Resource, self).unlink()
+
+        self.env['employee.week.load'].refresh_total_workloads(keys)
 
         return rec
 
+    def get_week_load_keys(self):
+        """
+        Returns the employees and the weeks of the timespans of the resources
+
+        :return: set of (employee_id, week_id) tuples
+        """
+        week_obj = self.env['week.model']
+        keys = set()
+        for resource in self.filtered(lambda resource: resource.start_date and resource.end_date):
+            weeks = week_obj.resolve_weeks(resource.compute_weeks(resource.start_date, resource.end_date))
+            keys.update((resource.employee.id, week_id) for week_id in weeks.ids)
+
+        return keys
+
     def create_corresponding_models(self, rec):
         """
         Creates corresponding week.models (if missing).
-        Creates corresponding weekly_resource.models (if missing) and
+        Creates corresponding weekly_resource.models (if missing, not in the sparse mode) and
         deletes weekly_resource.models which are not within the start_date
         and end_date anymore (when updating a resource model).
 
-        :param rec: the Resource model which requires the other models
+        :param rec: the Resource models which require the other models
         """
-        # Create missing week.model
-        week_data = rec.compute_weeks(rec.start_date, rec.end_date)
-        week_array = week_data[0]
-        for week in week_array:
-            exists = self.env['week.model'].search([['week_num', '=', week['week_num']], ['year', '=', week['year']]])
-            if not exists:
-                rec.add_weeks_object(week)
+        week_data_map = {resource.id: resource.compute_weeks(resource.start_date, resource.end_date)
+                         for resource in rec}
+
+        # Create missing week.model (once for all resources)
+        self.env['week.model'].create_missing_weeks(merge_week_data(week_data_map))
+
+        # all weekly_resources of the resources are fetched once and split into the kept and the spare ones
+        weekly_resources = self.env['weekly_resource.model'].search([['resource_id', 'in', rec.ids]])
+        kept = rec.get_weekly_resources_in(week_data_map, weekly_resources)
 
         # Create weekly_resource.model
-        project_week_data = week_data[1]
-        rec.add_missing_weekly_resources(project_week_data)
-        rec.delete_spare_weekly_resources(project_week_data)
+        rec.add_missing_weekly_resources_map(week_data_map, kept)
 
-    def add_missing_weekly_resources(self, project_week_data):
+        spare = weekly_resources - kept
+        if spare:
+            spare.unlink()
+
+    def update_end_dates(self, old_end_dates):
         """
-        Creates a new weekly_resource for all weeks in project_week_date
-        if it does not exist yet
+        Creates the weekly_resources of the weeks added by moving the end_dates
+        or deletes the ones of the weeks removed by moving them.
+        The weeks between start_date and the earlier of both end dates are not touched.
+        The added weekly_resources of all resources are created and the removed ones are deleted at once.
 
-        :param project_week_data: all weeks (defining the timespan) of the resource
+        :param old_end_dates: dict {resource_id: the end_date before it was moved}
+        :return: set of (employee_id, week_id) tuples of the added and removed weeks
         """
-        for week in project_week_data:
-            exists = self.env['weekly_resource.model'].search([['resource_id', '=', self.id],
-                                                               ['week_id.week_num', '=', week['week_num']],
-                                                               ['week_id.year', '=', week['year']]])
+        added = {}
+        removed = {}
+        for resource in self:
+            old_end_date = old_end_dates[resource.id]
+            if get_week(resource.end_date) > get_week(old_end_date):
+                added[resource.id] = resource.compute_weeks(old_end_date + datetime.timedelta(weeks=1),
+                                                            resource.end_date)
+            elif get_week(resource.end_date) < get_week(old_end_date):
+                removed[resource.id] = resource.compute_weeks(resource.end_date + datetime.timedelta(weeks=1),
+                                                              old_end_date)
+
+        if added:
+            self.env['week.model'].create_missing_weeks(merge_week_data(added))
+            self.browse(list(added)).add_missing_weekly_resources_map(added)
+
+        if removed:
+            spare = self.browse(list(removed)).get_weekly_resources_in(removed)
+            if spare:
+                spare.unlink()
+
+        week_obj = self.env['week.model']
+        keys = set()
+        for resource_id, week_data in list(added.items()) + list(removed.items()):
+            employee_id = self.browse(resource_id).employee.id
+            keys.update((employee_id, week_id) for week_id in week_obj.resolve_weeks(week_data).ids)
+
+        return keys
+
+    def get_weekly_resources_in(self, week_data_map, weekly_resources=None):
+        """
+        Fetches the weekly_resources of the resources in the weeks of week_data_map with a single search,
+        or filters them out of the already fetched weekly_resources
 
-            if exists and not(exists.manually_changed):
-                exists.weekly_workload = self.base_workload
+        :param week_data_map: dict {resource_id: array of week-data}
+        :param weekly_resources: the already fetched weekly_resources of the resources, searched if None
+        :return: the weekly_resources of each resource which lie in the resource's weeks
+        """
+        week_obj = self.env['week.model']
+        week_ids_map = {resource_id: set(week_obj.resolve_weeks(week_data).ids)
+                        for resource_id, week_data in week_data_map.items()}
+        if weekly_resources is None:
+            weekly_resources = self.env['weekly_resource.model'].search(
+                [['resource_id', 'in', list(week_ids_map)],
+                 ['week_id', 'in', list(set().union(*week_ids_map.values()))]])
 
-            if not exists:
-                week_model = self.env['week.model'].search([['week_num', '=', week['week_num']],
-                                                        ['year', '=', week['year']]])
+        return weekly_resources.filtered(
+            lambda weekly_resource: weekly_resource.week_id.id in week_ids_map.get(weekly_resource.resource_id.id, ()))
 
-                if self.employee.compute_total_workload(week_model) + self.base_workload > 100:
-                    raise exceptions.ValidationError("The workload in week " + week_model.week_string + " is too high")
+    def add_missing_weekly_resources(self, project_week_data):
+        """
+        Creates a new weekly_resource for all weeks in project_week_date
+        if it does not exist yet and updates the workload of the existing
+        weekly_resources which weren't changed manually.
 
-                values = {'week_id': week_model.id, 'resource_id': self.id, 'weekly_workload': self.base_workload}
-                self.add_weekly_resource(values)
+        :param project_week_data: all weeks (defining the timespan) of the resource
+        """
+        self.add_missing_weekly_resources_map({resource.id: project_week_data for resource in self})
 
+    def add_missing_weekly_resources_map(self, week_data_map, existing=None):
+        """
+        Same as add_missing_weekly_resources for resources with different timespans.
+        The existing weekly_resources of all resources are fetched once (or passed in), the workloads of all
+        affected employees are checked with one lookup and all missing weekly_resources are created at once.
+        Inside employee.week.load's defer_capacity_check, the workloads are checked at the end of the block instead.
+        In the sparse mode, the missing weekly_resources are not created, their workloads are derived from
+        the timespan and checked when the total workloads are updated.
+
+        :param week_data_map: dict {resource_id: all weeks (defining the timespan) of the resource}
+        :param existing: the weekly_resources of the resources in their weeks, fetched if None
+        :raises:
+            :exception ValidationError: if the total workload of an employee in a week would be larger than 100
+        """
+        week_obj = self.env['week.model']
+        if existing is None:
+            existing = self.get_weekly_resources_in(week_data_map)
+        existing_keys = set((weekly_resource.resource_id.id, weekly_resource.week_id.id)
+                            for weekly_resource in existing)
+
+        missing = []
+        added_workloads = {}
+        for resource in self:
+            for week_model in week_obj.resolve_weeks(week_data_map[resource.id]):
+                if (resource.id, week_model.id) not in existing_keys:
+                    missing.append((resource, week_model))
+                    key = (resource.employee.id, week_model.id)
+                    added_workloads[key] = added_workloads.get(key, 0) + resource.base_workload
+
+        sparse = self.env['weekly_workload.model'].is_sparse_mode()
+
+        if missing and not sparse and not self.env['employee.week.load'].is_capacity_check_deferred():
+            weeks = week_obj.browse(list(set(week_model.id for resource, week_model in missing)))
+            # no concurrent transaction may book these employees until this one ends
+            self.env['employee.week.load'].lock_employees(self.mapped('employee').ids)
+            total_workloads = self.mapped('employee').compute_total_workloads(weeks)
+            too_high = week_obj.browse([week_id for (employee_id, week_id), workload in added_workloads.items()
+                                        if total_workloads.get((employee_id, week_id), 0) + workload > 100])
+            if too_high:
+                week_model = too_high.sorted('yearweek')[0]
+                raise exceptions.ValidationError("The workload in week " + week_model.week_string + " is too high")
+
+        # resources with the same base_workload are updated together
+        changed = {}
+        for weekly_resource in existing:
+            base_workload = weekly_resource.resource_id.base_workload
+            if not weekly_resource.manually_changed and weekly_resource.weekly_workload != base_workload:
+                changed[base_workload] = changed.get(base_workload, self.env['weekly_resource.model']) | weekly_resource
+        for base_workload, weekly_resources in changed.items():
+            weekly_resources.write({'weekly_workload': base_workload})
+
+        if missing and not sparse:
+            self.add_weekly_resource([{'week_id': week_model.id,
+                                       'resource_id': resource.id,
+                                       'weekly_workload': resource.base_workload} for resource, week_model in missing])
 
     def delete_spare_weekly_resources(self, project_week_data):
         """
@@ -186,16 +383,19 @@ class Resource(models.Model):
 
         :param project_week_data: all weeks (defining the timespan) of the resource
         """
-        weekly_resources = self.env['weekly_resource.model'].search([['resource_id', '=', self.id]])
-        for weekly_resource in weekly_resources:
-            exists = False
-            for week in project_week_data:
-                if week['week_num'] == weekly_resource.week_id.week_num and \
-                        week['year'] == weekly_resource.week_id.year:
-                    exists = True
+        self.delete_spare_weekly_resources_map({resource.id: project_week_data for resource in self})
+
+    def delete_spare_weekly_resources_map(self, week_data_map):
+        """
+        Same as delete_spare_weekly_resources for resources with different timespans.
+        The spare weekly_resources of all resources are deleted at once.
 
-            if not exists:
-                weekly_resource.unlink()
+        :param week_data_map: dict {resource_id: all weeks (defining the timespan) of the resource}
+        """
+        weekly_resources = self.env['weekly_resource.model'].search([['resource_id', 'in', self.ids]])
+        spare = weekly_resources - self.get_weekly_resources_in(week_data_map, weekly_resources)
+        if spare:
+            spare.unlink()
 
     @api.model_create_multi
     def add_weeks_object(self, week):
@@ -223,63 +423,13 @@ class Resource(models.Model):
 
     def compute_weeks(self, start_date, end_date):
         """
-        Computes the subsequent weeks between the earliest start_date and the latest end_date of all resources.
-        Computes also all weeks in the timespan of a Resource model.
-        Returns both as arrays.
+        Computes the subsequent weeks between the start_date and the end_date of a Resource model.
+        Only the timespan of the Resource itself is walked, so the cost does not depend on the
+        number of other resources in the database.
         Called when a Resource model is created or modified.
 
         :param start_date: the start_date of the Resource
         :param end_date: the end_date of the Resource
-        :return: 2 arrays of week-data, one covering the timespan of all Resources, the other one only of the Resource
-
-        """
-        dates = self.compute_first_and_last_date(start_date, end_date)
-
-        # store dates as Integers to allow comparative operations
-        last_week = get_week(dates['last_date'])
-        start_week = get_week(start_date)
-        end_week = get_week(end_date)
-
-        date_i = dates['first_date']  # date iterator
-        week_i = get_week(date_i)  # week iterator
-
-        week_array = []
-        project_week_array = []
-
-        while week_i <= last_week:
-            # create dict object
-            week_data = {'week_num': date_i.isocalendar()[1], 'year': date_i.isocalendar()[0]}
-
-            week_array = week_array + [week_data]
-
-            # add week to project_week_array
-            if start_week <= week_i <= end_week:
-                project_week_array = project_week_array + [week_data]
-
-            # add one week time difference to the date
-            date_i = date_i + datetime.timedelta(weeks=1)
-            week_i = get_week(date_i)
-
-        return [week_array, project_week_array]
-
-    def compute_first_and_last_date(self, start_date, end_date):
+        :return: array of week-data covering the timespan of the Resource
         """
-        Computes the first start_date and the last end_date of all resources
-        including the parameters.
-
-        :param start_date: the start_date of the resource
-        :param end_date: the end_date of the resource
-        :return: first_date and last_date of all resources
-        """
-        start = self.env['resource.model'].search([])
-        if start:
-            min_date = min(start.mapped('start_date'))
-            max_date = max(start.mapped('end_date'))
-
-            first_date = start_date if start_date < min_date else min_date
-            last_date = end_date if end_date > max_date else max_date
-        else:
-            first_date = start_date
-            last_date = end_date
-
-        return {'first_date': first_date, 'last_date': last_date}
+        return compute_week_data(start_date, end_date)
@@ -1,4 +1,4 @@
-from odoo import models, fields, api, exceptions
+from odoo import models, fields, api, exceptions, tools
 
 
 class WeeklyResource(models.Model):
@@ -8,7 +8,9 @@ class WeeklyResource(models.Model):
 
     # manually_changed is a boolean value that is set to true when the workload of specifically this weekly_resource
       object is manually changed. If it is true this objects workload will not be updated if the base_workload 
-      of the resource object is changed.
+      of the resource object is changed. It is computed from the weekly_workload, but can also be set explicitly.
+    # employee_id, project_id and yearweek are copies of the fields of the resource and the week,
+      so the weekly_resources can be searched and grouped without joining the other tables.
 
     """
     _name = "weekly_resource.model"
@@ -19,37 +21,112 @@ class WeeklyResource(models.Model):
     week_id = fields.Many2one('week.model', 'Week Id', required=True, ondelete="cascade")
     resource_id = fields.Many2one('resource.model', 'Resource Id', required=True, ondelete="cascade")
     weekly_workload = fields.Integer(string='Workload %')
-    manually_changed = fields.Boolean(string='Manual change', default=False)
+    employee_id = fields.Many2one('hr.employee', 'Employee Id', related='resource_id.employee', store=True)
+    project_id = fields.Many2one('project.project', 'Project Id', related='resource_id.project', store=True,
+                                 index=True)
+    yearweek = fields.Integer(string='Year Week', related='week_id.yearweek', store=True, index=True)
+    manually_changed = fields.Boolean(string='Manual change', compute='compute_manually_changed', store=True,
+                                      readonly=False)
+
+    _sql_constraints = [
+        ('resource_week_unique', 'UNIQUE(resource_id, week_id)', 'A resource can only have one workload per week'),
+    ]
+
+    def init(self):
+        """
+        Creates the index used to sum up the workloads of an employee per week,
+        it also serves the lookups by employee_id alone
+        (the unique constraint already indexes resource_id and week_id)
+
+        """
+        tools.create_index(self.env.cr, 'weekly_resource_model_employee_week_index',
+                           self._table, ['employee_id', 'week_id'])
+
+    @api.model_create_multi
+    def create(self, values):
+        """
+        Constructor
+        Updates the total workloads (employee.week.load) of the weeks of the created weekly_resources
+
+        :param values: the values used to create the weekly_resource models
+        :return: the created records
+        """
+        rec = super(WeeklyResource, self).create(values)
+
+        self.env['employee.week.load'].refresh_total_workloads(rec.get_week_load_keys())
+
+        return rec
+
+    def write(self, values):
+        """
+        Overriding default write method
+        Updates the total workloads (employee.week.load) of the old and the new weeks
+        if the workload or the week of a weekly_resource is changed
+
+        :param values: the "new" values to be stored in the database
+        :return: a boolean indicating whether write has been successful or not
+        """
+        if not any(field in values for field in ('weekly_workload', 'week_id', 'resource_id')):
+            return super(WeeklyResource, self).write(values)
+
+        keys = self.get_week_load_keys()
+        rec = super(WeeklyResource, self).write(values)
+
+        self.env['employee.week.load'].refresh_total_workloads(keys | self.get_week_load_keys())
+
+        return rec
+
+    def unlink(self):
+        """
+        Overriding default unlink method
+        Updates the total workloads (employee.week.load) of the weeks of the deleted weekly_resources
+
+        :return: a boolean indicating whether unlink has been successful or not
+        """
+        keys = self.get_week_load_keys()
+        rec = super(WeeklyResource, self).unlink()
+
+        self.env['employee.week.load'].refresh_total_workloads(keys)
+
+        return rec
+
+    def get_week_load_keys(self):
+        """
+        Returns the employees and weeks of the weekly_resources
+
+        :return: set of (employee_id, week_id) tuples
+        """
+        return set((weekly_resource.employee_id.id, weekly_resource.week_id.id) for weekly_resource in self)
 
     @api.constrains('weekly_workload')
     def verify_workload(self):
         """
-        Checks if workload is between 1 and 100 and the total weekly workload assigned to an employee is <= 100%
+        Checks if workload is between 1 and 100. All weekly_resources are checked at once.
+        The total weekly workload assigned to an employee (<= 100%) is checked when
+        the total workloads (employee.week.load) are updated after the weekly_resources are saved,
+        with one query for all (employee, week) pairs of the saved weekly_resources.
 
         :raises:
-            :exception ValidationError: if workload < 0 or workload > 100 or the workload is too high
+            :exception ValidationError: if workload < 0 or workload > 100
         """
-        if self.weekly_workload > 100:
+        if self.filtered(lambda weekly_resource: weekly_resource.weekly_workload > 100):
             raise exceptions.ValidationError("The given workload can't be larger than 100")
-        elif self.weekly_workload < 0:
+        if self.filtered(lambda weekly_resource: weekly_resource.weekly_workload < 0):
             raise exceptions.ValidationError("The given workload can't be smaller than 0")
 
-        elif self.employee.compute_total_workload(self.week_id) > 100:
-            raise exceptions.ValidationError("The workload in week " + self.week_string + " is too high")
-
-    @api.constrains('weekly_workload')
-    def check_if_changed(self):
+    @api.depends('weekly_workload')
+    def compute_manually_changed(self):
         """
         Checks if the weekly_workload was manually changed.
         If so, manually_changed is set true.
+        Recomputed together with the weekly_workload, so it is stored in the same flush.
 
-        :rtype: bool
+        Does not depend on the base_workload of the resource: if it changes, the weekly_workload of the
+        weekly_resources which weren't changed manually is updated, which recomputes manually_changed.
         """
-        if self.weekly_workload != self.resource_id.base_workload:
-            self.manually_changed = True
-
-        else:
-            self.manually_changed = False
+        for weekly_resource in self:
+            base_workload = weekly_resource.resource_id.base_workload
+            weekly_resource.manually_changed = weekly_resource.weekly_workload != base_workload
 
     def name_get(self):
         """
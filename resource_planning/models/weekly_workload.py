@@ -0,0 +1,133 @@
+from odoo import models, fields, api, tools
+
+
+class WeeklyWorkload(models.Model):
+    """
+    Read-only SQL view with the workload of every resource in every week.
+    Used by the overview (pivot, graph), the report and the total workloads (employee.week.load).
+
+    In the default mode every week of a resource has a weekly_resource, so the view only lists them.
+    If sparse_weekly_resources is set on the settings page, only the manually changed weekly_resources
+    are stored and the other weeks are derived from the timespan and the base_workload of the resource.
+
+    """
+    _name = "weekly_workload.model"
+    _description = "Weekly Workload"
+    _auto = False
+    _order = "yearweek asc"
+    _depends = {
+        'resource.model': ['employee', 'project', 'start_date', 'end_date', 'base_workload'],
+        'weekly_resource.model': ['resource_id', 'week_id', 'weekly_workload', 'manually_changed'],
+        'week.model': ['yearweek', 'week_string', 'date_start', 'date_end'],
+    }
+
+    resource_id = fields.Many2one('resource.model', 'Resource Id', readonly=True)
+    week_id = fields.Many2one('week.model', 'Week Id', readonly=True)
+    weekly_resource_id = fields.Many2one('weekly_resource.model', 'Weekly Resource Id', readonly=True)
+    employee_id = fields.Many2one('hr.employee', 'Employee', readonly=True)
+    project_id = fields.Many2one('project.project', 'Project', readonly=True)
+    yearweek = fields.Integer(string='Year Week', readonly=True)
+    week_string = fields.Char(string='Week String', readonly=True)
+    week_bool = fields.Boolean(related='week_id.week_bool', string="is week in the weeks defined by settings")
+    start_date = fields.Datetime(string='Start Date', readonly=True)
+    end_date = fields.Datetime(string='End Date', readonly=True)
+    base_workload = fields.Integer(string='Workload in %', readonly=True)
+    weekly_workload = fields.Integer(string='Workload %', readonly=True)
+    manually_changed = fields.Boolean(string='Manual change', readonly=True)
+
+    def init(self):
+        """
+        (Re-)creates the view when the module is installed or updated.
+        The ids of the stored weekly_resources are kept, the derived weeks get ids above 2^32.
+
+        The employee, project and yearweek of the stored weekly_resources are joined from their resource and week,
+        not read from the stored related columns of weekly_resource_model. When the module is updated,
+        these columns are only computed after init, but the total workloads (employee.week.load)
+        are rebuilt from this view in init already.
+        The derived weeks are only evaluated in the sparse mode: the setting is checked once per query
+        (one-time filter), so in the default mode the range join over all resources and weeks is never executed.
+
+        """
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute("""
+            CREATE OR REPLACE VIEW weekly_workload_model AS (
+                SELECT wr.id::bigint AS id, wr.resource_id, wr.week_id, wr.id AS weekly_resource_id,
+                       r.employee AS employee_id, r.project AS project_id,
+                       w.yearweek, w.week_string, r.start_date, r.end_date, r.base_workload,
+                       wr.weekly_workload, COALESCE(wr.manually_changed, FALSE) AS manually_changed
+                FROM weekly_resource_model wr
+                JOIN resource_model r ON r.id = wr.resource_id
+                JOIN week_model w ON w.id = wr.week_id
+
+                UNION ALL
+
+                SELECT (r.id::bigint << 32) + w.id AS id, r.id AS resource_id, w.id AS week_id,
+                       NULL AS weekly_resource_id,
+                       r.employee AS employee_id, r.project AS project_id,
+                       w.yearweek, w.week_string, r.start_date, r.end_date, r.base_workload,
+                       r.base_workload AS weekly_workload, FALSE AS manually_changed
+                FROM resource_model r
+                JOIN week_model w ON w.date_end >= r.start_date::date AND w.date_start <= r.end_date::date
+                WHERE EXISTS (SELECT 1 FROM ir_config_parameter
+                              WHERE key = 'resource_planning.sparse_weekly_resources' AND value = 'True')
+                AND NOT EXISTS (SELECT 1 FROM weekly_resource_model wr
+                                WHERE wr.resource_id = r.id AND wr.week_id = w.id)
+            )
+        """)
+
+    @api.model
+    def is_sparse_mode(self):
+        """
+        :return: True if only the manually changed weekly_resources are stored (set on the settings page)
+        """
+        sparse = self.env['ir.config_parameter'].sudo().get_param('resource_planning.sparse_weekly_resources')
+        return sparse == 'True'
+
+    @api.model
+    def store_derived_weeks(self):
+        """
+        Stores a weekly_resource for every week which is derived from the timespan of its resource,
+        with a single INSERT statement, and rebuilds the total workloads (employee.week.load).
+        Called before the sparse mode is switched off, as the view then only lists the stored weekly_resources.
+
+        """
+        self.env['weekly_resource.model'].flush()
+        self.env['resource.model'].flush()
+
+        self.env.cr.execute("""
+            INSERT INTO weekly_resource_model (resource_id, week_id, weekly_workload, manually_changed,
+                                               employee_id, project_id, yearweek,
+                                               create_uid, create_date, write_uid, write_date)
+            SELECT ww.resource_id, ww.week_id, ww.weekly_workload, FALSE,
+                   ww.employee_id, ww.project_id, ww.yearweek,
+                   %s, (now() at time zone 'UTC'), %s, (now() at time zone 'UTC')
+            FROM weekly_workload_model ww
+            WHERE ww.weekly_resource_id IS NULL
+            ON CONFLICT (resource_id, week_id) DO NOTHING
+        """, [self.env.uid, self.env.uid])
+
+        self.env['weekly_resource.model'].invalidate_cache()
+        self.env['resource.model'].invalidate_cache(['weekly_resources'])
+        self.env['employee.week.load'].rebuild_total_workloads()
+
+    def open_weekly_resource(self):
+        """
+        Opens the weekly_resource of the week to change its workload.
+        Creates it with the base_workload first, if the week is derived from the timespan of the resource.
+
+        :return: the action opening the form of the weekly_resource
+        """
+        self.ensure_one()
+        weekly_resource = self.weekly_resource_id
+        if not weekly_resource:
+            weekly_resource = self.env['resource.model'].add_weekly_resource(
+                {'week_id': self.week_id.id, 'resource_id': self.resource_id.id,
+                 'weekly_workload': self.base_workload})
+
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': 'weekly_resource.model',
+            'view_mode': 'form',
+            'res_id': weekly_resource.id,
+            'target': 'new',
+        }
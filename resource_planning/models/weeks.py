@@ -1,6 +1,117 @@
 import datetime
 
-from odoo import models, fields, api, exceptions
+from odoo import models, fields, api, exceptions, tools
+
+
+def get_week(date):
+    """
+    Returns the year and week of a given date as Integer in
+    the format YYYYWW  (Y Year, W Week)
+
+    :param date:
+    :return: year and week: YYYYWW
+    """
+    year = date.isocalendar()[0]
+    week = date.isocalendar()[1]
+    return format_yearweek(year, week)
+
+
+def format_yearweek(year, week_num):
+    """
+    Returns the year and week as Integer in the format YYYYWW (Y Year, W Week),
+    which sorts the weeks chronologically
+
+    :param year: the year of the week
+    :param week_num: the week number
+    :return: year and week: YYYYWW
+    """
+    return year * 100 + week_num
+
+
+def format_week_string(year, week_num):
+    """
+    Returns the string representation of a week with a 'W' prefix, separated by a comma
+    e.g. 2020, W05
+
+    :param year: the year of the week
+    :param week_num: the week number
+    :return: the week_string
+    """
+    string = str(year) + ', W'
+    if week_num < 10:
+        string = string + "0" + str(week_num)
+    else:
+        string = string + str(week_num)
+    return string
+
+
+def get_start_of_week(year, week_num):
+    """
+    Returns the monday of a week as datetime
+    According to the ISO calendar, the first week of a year is the week containing the 4th of January.
+
+    :param year: the year of the week
+    :param week_num: the week number
+    :return: the date of the monday of the week
+    """
+    temp = datetime.datetime(year, 1, 4)
+    temp = temp - datetime.timedelta(temp.weekday())
+    delta = datetime.timedelta(days=(week_num - 1) * 7)
+    return temp + delta
+
+
+def compute_week_data(start_date, end_date):
+    """
+    Computes the subsequent weeks between start_date and end_date
+
+    :param start_date: the first date of the timespan
+    :param end_date: the last date of the timespan
+    :return: array of dicts with the week_num and the year of the weeks
+    """
+    # store dates as Integers to allow comparative operations
+    end_week = get_week(end_date)
+
+    date_i = start_date  # date iterator
+    week_i = get_week(date_i)  # week iterator
+
+    week_data = []
+
+    while week_i <= end_week:
+        week_data.append({'week_num': date_i.isocalendar()[1], 'year': date_i.isocalendar()[0]})
+
+        # add one week time difference to the date
+        date_i = date_i + datetime.timedelta(weeks=1)
+        week_i = get_week(date_i)
+
+    return week_data
+
+
+def merge_week_data(week_data_map):
+    """
+    Merges the week-data of several timespans, every week is contained only once
+
+    :param week_data_map: dict with arrays of dicts with the week_num and the year of the weeks as values
+    :return: array of dicts with the week_num and the year of all weeks, in order of first occurrence
+    """
+    merged = {}
+    for week_data in week_data_map.values():
+        for week in week_data:
+            merged.setdefault((week['year'], week['week_num']), week)
+
+    return list(merged.values())
+
+
+def get_period_bounds(this_week, week_delta):
+    """
+    Returns the first and the last monday of the period defined by this_week and week_delta
+
+    :param this_week: the current week
+    :param week_delta: the timespan used for filtering
+    :return: the first and the last monday of the period as dates
+    """
+    other_week = this_week + datetime.timedelta(weeks=week_delta)
+    bounds = sorted([fields.Date.to_date(this_week), fields.Date.to_date(other_week)])
+    return bounds[0], bounds[1]
 
 
 class Weeks(models.Model):
@@ -9,38 +120,216 @@ class Weeks(models.Model):
     Stores also other variables used in the module:
 
     # week_string to represent a week_model in the UI
-    # week_bool to declare whether a week is in the timespan defined by res_config_settings.
+    # yearweek to sort and compare weeks (YYYYWW)
+    # date_start and date_end (monday and sunday) to join weeks to dates
+    # week_bool to declare whether a week is in the timespan defined by res_config_settings,
+      computed when it is read or searched, so it follows the current date and the settings.
 
     """
     _name = "week.model"
     _description = "Week"
-    _order = "week_string asc"
+    _order = "yearweek asc"
 
     week_num = fields.Integer(string='Week', required=True)
     year = fields.Integer(string="Year", required=True)
     week_string = fields.Char(string="Week String", compute='build_week_string', store=True)
-    week_bool = fields.Boolean(compute="is_week_in_period", string="is week in the weeks defined by settings",
-                               store=True)
+    yearweek = fields.Integer(string="Year Week", compute='build_week_string', store=True, index=True)
+    date_start = fields.Date(string="Start Date", compute='build_week_dates', store=True, index=True)
+    date_end = fields.Date(string="End Date", compute='build_week_dates', store=True, index=True)
+    week_bool = fields.Boolean(compute="is_week_in_period", search="search_week_bool",
+                               string="is week in the weeks defined by settings")
 
     _sql_constraints = [
         ('week_unique', 'UNIQUE(week_num, year)', 'Something went wrong, please try again'),
     ]
 
-    @api.model
+    @api.model_create_multi
     def create(self, values):
         """
         Constructor
-        calls is_week_in_period to set the week_bool
-        :param values: the values used to create the week model
+        Invalidates the week lookup cache
+        :param values: the values used to create the week models
 
-        :return: the created record
+        :return: the created records
         """
         rec = super(Weeks, self).create(values)
 
-        rec.is_week_in_period()
+        self.clear_caches()
 
         return rec
 
+    def write(self, values):
+        """
+        Overriding default write method
+        Invalidates the week lookup cache if week_num or year is changed
+
+        :param values: the "new" values to be stored in the database
+        :return: a boolean indicating whether write has been successful or not
+        """
+        rec = super(Weeks, self).write(values)
+
+        if 'week_num' in values or 'year' in values:
+            self.clear_caches()
+
+        return rec
+
+    def unlink(self):
+        """
+        Overriding default unlink method
+        Invalidates the week lookup cache
+
+        :return: a boolean indicating whether unlink has been successful or not
+        """
+        rec = super(Weeks, self).unlink()
+
+        self.clear_caches()
+
+        return rec
+
+    @api.model
+    @tools.ormcache()
+    def get_week_id_map(self):
+        """
+        Maps (year, week_num) to the id of the corresponding week model for all committed weeks.
+        Cached process-wide with ormcache, the cache is cleared (also in the other workers)
+        whenever weeks are created, unlinked or their year or week_num is changed.
+        The map is read with an own cursor, so it never contains weeks of a transaction which could still
+        be rolled back. Weeks created by the current transaction are looked up by fetch_week_ids instead.
+
+        :return: frozendict {(year, week_num): id}
+        """
+        with self.pool.cursor() as cr:
+            cr.execute("SELECT year, week_num, id FROM week_model")
+            return tools.frozendict(((year, week_num), week_id) for year, week_num, week_id in cr.fetchall())
+
+    @api.model
+    def fetch_week_ids(self, keys):
+        """
+        Looks up the ids of the weeks in the database, including the ones created by the current transaction
+
+        :param keys: list of (year, week_num) tuples
+        :return: dict {(year, week_num): id} of the existing weeks
+        """
+        if not keys:
+            return {}
+
+        self.env.cr.execute("""
+            SELECT w.year, w.week_num, w.id
+            FROM week_model w
+            JOIN unnest(%s::int[], %s::int[]) AS k(year, week_num)
+              ON k.year = w.year AND k.week_num = w.week_num
+        """, [[key[0] for key in keys], [key[1] for key in keys]])
+        return {(year, week_num): week_id for year, week_num, week_id in self.env.cr.fetchall()}
+
+    @api.model
+    def resolve_week(self, year, week_num):
+        """
+        Returns the week model of a week, searching the database only if the week isn't cached
+
+        :param year: the year of the week
+        :param week_num: the week number
+        :return: the week model or an empty recordset if the week doesn't exist
+        """
+        return self.resolve_weeks([{'year': year, 'week_num': week_num}])
+
+    @api.model
+    def resolve_weeks(self, week_data):
+        """
+        Returns the week models of the weeks in week_data, searching the database only for the weeks
+        which aren't cached
+
+        :param week_data: array of dicts with the week_num and the year of the weeks
+        :return: the existing week models of the weeks in week_data, in the same order
+        """
+        week_id_map = self.get_week_id_map()
+        keys = [(week['year'], week['week_num']) for week in week_data]
+        missing = [key for key in keys if key not in week_id_map]
+        if missing:
+            week_id_map = dict(week_id_map)
+            week_id_map.update(self.fetch_week_ids(missing))
+        return self.browse([week_id_map[key] for key in keys if key in week_id_map])
+
+    @api.model
+    def create_missing_weeks(self, week_data):
+        """
+        Creates all weeks of week_data which don't exist yet with a single INSERT statement.
+        week_string, yearweek and the dates are computed once for the whole batch.
+        The ids of the created weeks are taken from the INSERT (RETURNING), the ids of the weeks
+        which already existed are looked up afterwards, so the result never depends on the cache.
+        Weeks which were committed before the transaction started are skipped (ON CONFLICT DO NOTHING).
+        If a concurrent transaction commits one of the weeks after this transaction started,
+        the insert raises a serialization failure under REPEATABLE READ and Odoo retries the whole request,
+        which then finds the week. Concurrent creation of the same weeks is therefore not conflict-free,
+        it only ends in a retry instead of a duplicate week or a user error.
+
+        :param week_data: array of dicts with the week_num and the year of the weeks
+        :return: the week models of all weeks in week_data, in the same order
+        """
+        if not week_data:
+            return self.browse()
+
+        week_id_map = self.get_week_id_map()
+        keys = [(week['year'], week['week_num']) for week in week_data]
+        missing = list(dict.fromkeys(key for key in keys if key not in week_id_map))
+        if not missing:
+            return self.browse([week_id_map[key] for key in keys])
+
+        for year, week_num in missing:
+            if week_num < 1:
+                raise exceptions.ValidationError("Week Number can't be smaller than 1")
+            elif week_num > 53:
+                raise exceptions.ValidationError("Week Number can't be bigger than 53")
+
+        rows = []
+        params = []
+        for year, week_num in missing:
+            start_date_of_week = get_start_of_week(year, week_num)
+            rows.append("(%s, %s, %s, %s, %s, %s, %s, (now() at time zone 'UTC'), %s, (now() at time zone 'UTC'))")
+            params.extend([week_num, year,
+                           format_week_string(year, week_num),
+                           format_yearweek(year, week_num),
+                           start_date_of_week.date(),
+                           (start_date_of_week + datetime.timedelta(days=6)).date(),
+                           self.env.uid, self.env.uid])
+
+        self.env.cr.execute("""
+            INSERT INTO week_model (week_num, year, week_string, yearweek, date_start, date_end,
+                                    create_uid, create_date, write_uid, write_date)
+            VALUES {}
+            ON CONFLICT (week_num, year) DO NOTHING
+            RETURNING year, week_num, id
+        """.format(", ".join(rows)), params)
+
+        week_id_map = dict(week_id_map)
+        week_id_map.update(((year, week_num), week_id) for year, week_num, week_id in self.env.cr.fetchall())
+        # the weeks which existed, but weren't cached (e.g. created earlier in this transaction)
+        week_id_map.update(self.fetch_week_ids([key for key in missing if key not in week_id_map]))
+
+        # the other workers refill their cache with the committed weeks
+        self.clear_caches()
+
+        return self.browse([week_id_map[key] for key in keys])
+
+    @api.model
+    def provision_calendar(self):
+        """
+        Creates all missing weeks from the beginning of the year calendar_years_back years ago
+        until the end of the year calendar_years_ahead years ahead (both set on the settings page).
+        Called daily by a cron job, so that saving a resource doesn't have to create weeks.
+
+        :return: the week models of the provisioned timespan
+        """
+        ICPSudo = self.env['ir.config_parameter'].sudo()
+        years_ahead = int(ICPSudo.get_param('resource_planning.calendar_years_ahead', 0))
+        years_back = int(ICPSudo.get_param('resource_planning.calendar_years_back', 0))
+
+        today = fields.Date.today()
+        # January 4th is always in the first and December 28th always in the last ISO week of a year
+        first_date = datetime.date(today.year - years_back, 1, 4)
+        last_date = datetime.date(today.year + years_ahead, 12, 28)
+
+        return self.create_missing_weeks(compute_week_data(first_date, last_date))
+
     def name_get(self):
         """
          Creates a string representation which is used for the report view
@@ -56,63 +345,83 @@ class Weeks(models.Model):
         """
         Calculates the current week and calls set_is_week_in_period
         Gets week_delta (number of weeks one would like to see in the filter) from ir.config_parameter
-        Called daily so filter is up to date
+        Computes week_bool whenever it is read, so the filter is always up to date
         :return: week_delta
         """
+        this_week, week_delta = self.compute_period()
+
+        self.set_is_week_in_period(this_week, week_delta)
+        return week_delta
+
+    def compute_period(self):
+        """
+        Calculates the current week and gets week_delta from ir.config_parameter
+        (cached by ir.config_parameter, so no query is needed after the first call)
+
+        :return: this_week and week_delta
+        """
         today = datetime.datetime.today()
         week_delta = int(self.env['ir.config_parameter'].sudo().get_param('resource_planning.filter_weeks'))
         this_week_uncut = today - datetime.timedelta(today.weekday())
         this_week = this_week_uncut.replace(hour=0, minute=0, second=0, microsecond=0)
 
-        self.set_is_week_in_period(this_week, week_delta)
-        return week_delta
+        return this_week, week_delta
 
     def set_is_week_in_period(self, this_week, week_delta):
         """
         Sets week_bool whether the week is in the period the user wants or not (true or false)
-        Called daily so filter is up to date
+        based on the date_start of the week, without writing to the database
 
         :param this_week: the current week number
         :param week_delta: the timespan used for filtering
         """
+        first_monday, last_monday = get_period_bounds(this_week, week_delta)
 
         for week in self:
-            year = week.year
-            temp = datetime.datetime(year, 1, 1)
-            temp = temp - datetime.timedelta(temp.weekday())
-            delta = datetime.timedelta(days=(week.week_num - 1) * 7)
-            start_date_of_week = temp + delta
-
-            if week_delta >= 0:
-                if this_week + datetime.timedelta(
-                        weeks=week_delta) >= start_date_of_week and this_week <= start_date_of_week:
-                    week.week_bool = True
-                else:
-                    week.week_bool = False
-
-            else:
-                if this_week + datetime.timedelta(
-                        weeks=week_delta) <= start_date_of_week and this_week >= start_date_of_week:
-                    week.week_bool = True
-                else:
-                    week.week_bool = False
+            week.week_bool = bool(week.date_start) and first_monday <= week.date_start <= last_monday
+
+    def search_week_bool(self, operator, value):
+        """
+        Turns a search on week_bool into a range of date_start,
+        so the filter "custom timespan" is evaluated by the database at query time
+
+        :param operator: the operator of the search domain, '=' or '!='
+        :param value: the searched boolean value
+        :return: the search domain on date_start
+        """
+        this_week, week_delta = self.compute_period()
+        first_monday, last_monday = get_period_bounds(this_week, week_delta)
+
+        if (operator == '=') == bool(value):
+            return ['&', ('date_start', '>=', first_monday), ('date_start', '<=', last_monday)]
+        return ['|', '|', ('date_start', '=', False), ('date_start', '<', first_monday),
+                ('date_start', '>', last_monday)]
 
     @api.depends('year', 'week_num')
     def build_week_string(self):
         """
         Builds and stores the week_string attribute
         based on year and week_num with a 'W' prefix, separated by a comma
+        and the yearweek attribute used to sort the weeks
 
         """
         for s in self:
-            string = str(s.year) + ', W'
-            if s.week_num < 10:
-                string = string + "0" + str(s.week_num)
-            else:
-                string = string + str(s.week_num)
-            s.week_string = string
+            s.week_string = format_week_string(s.year, s.week_num)
+            s.yearweek = format_yearweek(s.year, s.week_num)
         return 0
 
+    @api.depends('year', 'week_num')
+    def build_week_dates(self):
+        """
+        Builds and stores the date_start (monday) and date_end (sunday) attributes
+        based on year and week_num according to the ISO calendar
+
+        """
+        for s in self:
+            start_date_of_week = get_start_of_week(s.year, s.week_num)
+            s.date_start = start_date_of_week.date()
+            s.date_end = (start_date_of_week + datetime.timedelta(days=6)).date()
+
     @api.constrains('week_num')
     def check_if_week_num_is_valid(self):
         """
@@ -3,4 +3,6 @@ from . import test_resource
 from . import test_weekly_resource
 from . import test_integration
 from . import test_employee
+from . import test_employee_week_load
+from . import test_weekly_workload
 # from . import test_tours
@@ -0,0 +1,29 @@
+from odoo.tests import common
+
+
+class WorkloadTransactionCase(common.TransactionCase):
+    """
+    Base class for the tests of the weekly and total workloads, provides the shared helpers
+    """
+
+    def create_resource(self, employee, base_workload, start_date, end_date):
+        """
+        Creates a resource for the employee in a new project
+
+        :return: the created resource
+        """
+        project = self.env['project.project'].create({'name': 'p1'})
+        values = {'project': project.id,
+                  'employee': employee.id,
+                  'base_workload': base_workload,
+                  'start_date': start_date,
+                  'end_date': end_date}
+        return self.env['resource.model'].create(values)
+
+    def get_total_workload(self, employee, week):
+        """
+        Returns the stored total workload of the employee in the week
+
+        :return: the stored total workload
+        """
+        return self.env['employee.week.load'].get_total_workloads(employee, week).get((employee.id, week.id), 0)
@@ -98,3 +98,63 @@ class TestEmployee(common.TransactionCase):
         self.assertEqual(total_workload_week_53, 20, "Total workload in week 53 should be 20 %")
         self.assertEqual(total_workload_week_1, 90, "Total workload in week 1 should be 90 %")
         self.assertEqual(total_workload_week_2, 70, "Total workload in week 2 should be 70 %")
+
+    def test_compute_total_workload_range(self):
+        """
+        Tests if the total workload is computed correctly for a range of weeks,
+        including a week without any workload
+
+        """
+        project = self.env['project.project'].create({'name': 'p1'})
+        employee = self.env['hr.employee'].create({'name': 'e1'})
+        values = {'project': project.id,
+                  'employee': employee.id,
+                  'base_workload': 30,
+                  'start_date': '2020-04-06 13:42:07',
+                  'end_date': '2020-04-19 13:42:07'}
+        self.env['resource.model'].create(values)
+
+        values2 = {'project': project.id,
+                   'employee': employee.id,
+                   'base_workload': 50,
+                   'start_date': '2020-04-13 13:42:07',
+                   'end_date': '2020-04-17 13:42:07'}
+        self.env['resource.model'].create(values2)
+
+        weeks = self.env['week.model'].create_missing_weeks([{'week_num': 15, 'year': 2020},
+                                                             {'week_num': 16, 'year': 2020},
+                                                             {'week_num': 17, 'year': 2020}])
+
+        total_workloads = employee.compute_total_workload_range(weeks)
+
+        self.assertEqual(total_workloads, {weeks[0].id: 30, weeks[1].id: 80, weeks[2].id: 0},
+                         "Total workloads should be 30 %, 80 % and 0 %")
+
+    def test_compute_total_workloads_multiple_employees(self):
+        """
+        Tests if the total workloads are computed correctly for multiple employees at once
+
+        """
+        project = self.env['project.project'].create({'name': 'p1'})
+        employee1 = self.env['hr.employee'].create({'name': 'e1'})
+        employee2 = self.env['hr.employee'].create({'name': 'e2'})
+        values = {'project': project.id,
+                  'employee': employee1.id,
+                  'base_workload': 40,
+                  'start_date': '2020-04-06 13:42:07',
+                  'end_date': '2020-04-10 13:42:07'}
+        self.env['resource.model'].create(values)
+
+        values2 = {'project': project.id,
+                   'employee': employee2.id,
+                   'base_workload': 60,
+                   'start_date': '2020-04-06 13:42:07',
+                   'end_date': '2020-04-10 13:42:07'}
+        self.env['resource.model'].create(values2)
+
+        week = self.env['week.model'].resolve_week(2020, 15)
+
+        total_workloads = (employee1 | employee2).compute_total_workloads(week)
+
+        self.assertEqual(total_workloads, {(employee1.id, week.id): 40, (employee2.id, week.id): 60},
+                         "Total workloads should be 40 % and 60 %")
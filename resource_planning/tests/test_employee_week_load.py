@@ -0,0 +1,188 @@
+from odoo import exceptions
+from odoo.tools import mute_logger
+from psycopg2 import errors
+
+from .common import WorkloadTransactionCase
+
+
+class TestEmployeeWeekLoad(WorkloadTransactionCase):
+    """
+    Class to test the EmployeeWeekLoad class
+    """
+
+    def test_create_resource(self):
+        """
+        Tests if creating resources updates the total workloads
+
+        """
+        employee = self.env['hr.employee'].create({'name': 'e1'})
+        self.create_resource(employee, 30, '2020-04-06 13:42:07', '2020-04-17 13:42:07')
+        self.create_resource(employee, 50, '2020-04-13 13:42:07', '2020-04-17 13:42:07')
+        week15 = self.env['week.model'].resolve_week(2020, 15)
+        week16 = self.env['week.model'].resolve_week(2020, 16)
+
+        self.assertEqual(self.get_total_workload(employee, week15), 30, "Total workload in week 15 should be 30 %")
+        self.assertEqual(self.get_total_workload(employee, week16), 80, "Total workload in week 16 should be 80 %")
+
+    def test_edit_weekly_resource(self):
+        """
+        Tests if editing the workload of a weekly_resource updates the total workload
+
+        """
+        employee = self.env['hr.employee'].create({'name': 'e1'})
+        resource = self.create_resource(employee, 30, '2020-04-06 13:42:07', '2020-04-10 13:42:07')
+        week = self.env['week.model'].resolve_week(2020, 15)
+
+        resource.weekly_resources.write({'weekly_workload': 60})
+
+        self.assertEqual(self.get_total_workload(employee, week), 60, "Total workload should be 60 %")
+
+    def test_delete_resource(self):
+        """
+        Tests if deleting a resource updates the total workloads
+
+        """
+        employee = self.env['hr.employee'].create({'name': 'e1'})
+        resource = self.create_resource(employee, 30, '2020-04-06 13:42:07', '2020-04-10 13:42:07')
+        week = self.env['week.model'].resolve_week(2020, 15)
+
+        resource.unlink()
+
+        self.assertEqual(self.get_total_workload(employee, week), 0, "Total workload should be 0 %")
+
+    def test_change_employee(self):
+        """
+        Tests if changing the employee of a resource moves the total workloads to the new employee
+
+        """
+        employee1 = self.env['hr.employee'].create({'name': 'e1'})
+        employee2 = self.env['hr.employee'].create({'name': 'e2'})
+        resource = self.create_resource(employee1, 30, '2020-04-06 13:42:07', '2020-04-10 13:42:07')
+        week = self.env['week.model'].resolve_week(2020, 15)
+
+        resource.write({'employee': employee2.id})
+
+        self.assertEqual(self.get_total_workload(employee1, week), 0, "Total workload of e1 should be 0 %")
+        self.assertEqual(self.get_total_workload(employee2, week), 30, "Total workload of e2 should be 30 %")
+
+    def test_refresh_total_workloads_too_high(self):
+        """
+        Tests if refreshing a total workload larger than 100 raises an exception
+
+        """
+        employee = self.env['hr.employee'].create({'name': 'e1'})
+        resource = self.create_resource(employee, 80, '2020-04-06 13:42:07', '2020-04-10 13:42:07')
+        week = self.env['week.model'].resolve_week(2020, 15)
+        self.env.cr.execute("UPDATE weekly_resource_model SET weekly_workload = 120 WHERE resource_id = %s",
+                            [resource.id])
+
+        with self.assertRaises(exceptions.ValidationError) as error:
+            self.env['employee.week.load'].refresh_total_workloads({(employee.id, week.id)})
+
+        self.assertEqual(error.exception.name, "The workload in week 2020, W15 is too high", "Error does not match")
+
+    def test_defer_capacity_check_swap(self):
+        """
+        Tests if two allocations can be swapped inside defer_capacity_check,
+        although the total workload is larger than 100 in between
+
+        """
+        employee = self.env['hr.employee'].create({'name': 'e1'})
+        resource1 = self.create_resource(employee, 60, '2020-04-06 13:42:07', '2020-04-10 13:42:07')
+        resource2 = self.create_resource(employee, 40, '2020-04-06 13:42:07', '2020-04-10 13:42:07')
+        week = self.env['week.model'].resolve_week(2020, 15)
+
+        with self.env['employee.week.load'].defer_capacity_check() as env:
+            resource2.with_env(env).write({'base_workload': 60})
+            resource1.with_env(env).write({'base_workload': 40})
+
+        self.assertEqual(resource1.weekly_resources.weekly_workload, 40, "Workload of resource 1 should be 40 %")
+        self.assertEqual(resource2.weekly_resources.weekly_workload, 60, "Workload of resource 2 should be 60 %")
+        self.assertEqual(self.get_total_workload(employee, week), 100, "Total workload should be 100 %")
+
+    def test_defer_capacity_check_too_high(self):
+        """
+        Tests if defer_capacity_check raises one exception listing all weeks with a too high workload
+
+        """
+        employee = self.env['hr.employee'].create({'name': 'e1'})
+        self.create_resource(employee, 60, '2020-04-06 13:42:07', '2020-04-24 13:42:07')
+
+        with self.assertRaises(exceptions.ValidationError) as error:
+            with self.env['employee.week.load'].defer_capacity_check() as env:
+                project = env['project.project'].create({'name': 'p2'})
+                env['resource.model'].create({'project': project.id,
+                                              'employee': employee.id,
+                                              'base_workload': 50,
+                                              'start_date': '2020-04-13 13:42:07',
+                                              'end_date': '2020-04-24 13:42:07'})
+
+        self.assertEqual(error.exception.name, "The workload in the weeks 2020, W16; 2020, W17 is too high",
+                         "Error does not match")
+
+    def test_create_resource_locks_employee(self):
+        """
+        Tests if booking an employee takes the advisory lock of this employee only
+
+        """
+        employee1 = self.env['hr.employee'].create({'name': 'e1'})
+        employee2 = self.env['hr.employee'].create({'name': 'e2'})
+        self.create_resource(employee1, 30, '2020-04-06 13:42:07', '2020-04-10 13:42:07')
+
+        self.env.cr.execute("""
+            SELECT objid::int FROM pg_locks
+            WHERE locktype = 'advisory' AND pid = pg_backend_pid()
+            AND classid = 'employee_week_load'::regclass::oid AND objid IN %s
+        """, [(employee1.id, employee2.id)])
+
+        self.assertEqual(self.env.cr.fetchall(), [(employee1.id,)], "Only e1 should be locked")
+
+    @mute_logger('odoo.sql_db')
+    def test_create_resource_employee_locked(self):
+        """
+        Tests if booking an employee raises a retryable error while another transaction holds the lock
+        of the employee
+
+        """
+        employee = self.env['hr.employee'].create({'name': 'e1'})
+
+        with self.registry.cursor() as cr:
+            cr.execute("SELECT pg_advisory_xact_lock('employee_week_load'::regclass::oid::int, %s)", [employee.id])
+            with self.assertRaises(errors.LockNotAvailable):
+                self.create_resource(employee, 30, '2020-04-06 13:42:07', '2020-04-10 13:42:07')
+            cr.rollback()
+
+    def test_rebuild_total_workloads(self):
+        """
+        Tests if rebuilding the total workloads stores the real sums, flags overloaded weeks
+        and deletes the rows of weeks without weekly workloads
+
+        """
+        employee = self.env['hr.employee'].create({'name': 'e1'})
+        resource = self.create_resource(employee, 80, '2020-04-06 13:42:07', '2020-04-24 13:42:07')
+        week15 = self.env['week.model'].resolve_week(2020, 15)
+        week16 = self.env['week.model'].resolve_week(2020, 16)
+        week17 = self.env['week.model'].resolve_week(2020, 17)
+        self.env.cr.execute("UPDATE weekly_resource_model SET weekly_workload = 120 WHERE resource_id = %s "
+                            "AND week_id = %s", [resource.id, week16.id])
+        self.env.cr.execute("DELETE FROM weekly_resource_model WHERE resource_id = %s AND week_id = %s",
+                            [resource.id, week17.id])
+
+        self.env['employee.week.load'].rebuild_total_workloads()
+
+        loads = self.env['employee.week.load'].search([('employee_id', '=', employee.id)])
+        self.assertEqual(sorted((load.week_id.id, load.total_workload, load.overloaded) for load in loads),
+                         sorted([(week15.id, 80, False), (week16.id, 120, True)]), "Total workloads do not match")
+
+    @mute_logger('odoo.sql_db')
+    def test_total_workload_check_constraint(self):
+        """
+        Tests if the database rejects total workloads larger than 100
+
+        """
+        employee = self.env['hr.employee'].create({'name': 'e1'})
+        self.create_resource(employee, 80, '2020-04-06 13:42:07', '2020-04-10 13:42:07')
+
+        with self.assertRaises(errors.CheckViolation):
+            self.env.cr.execute("UPDATE employee_week_load SET total_workload = 120 WHERE employee_id = %s",
+                                [employee.id])
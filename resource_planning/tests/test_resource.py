@@ -21,7 +21,7 @@ class TestResource(common.TransactionCase):
         week_data = self.env['resource.model'].compute_weeks(start_date, end_date)
 
         self.assertEqual(
-            week_data[1],
+            week_data,
             [{'week_num': 14, 'year': 2020}, {'week_num': 15, 'year': 2020}, {'week_num': 16, 'year': 2020}],
             'Should calculate project weeks 14 to 16'
         )
@@ -37,7 +37,7 @@ class TestResource(common.TransactionCase):
         week_data = self.env['resource.model'].compute_weeks(start_date, end_date)
 
         self.assertEqual(
-            week_data[1],
+            week_data,
             [{'week_num': 52, 'year': 2019}, {'week_num': 1, 'year': 2020},
              {'week_num': 2, 'year': 2020}, {'week_num': 3, 'year': 2020}],
             'Calculates weeks 52, 2019 to 3, 2020'
@@ -53,7 +53,7 @@ class TestResource(common.TransactionCase):
 
         week_data = self.env['resource.model'].compute_weeks(start_date, end_date)
 
-        self.assertEqual(week_data[1], [], 'No weeks because start and end date are interchanged')
+        self.assertEqual(week_data, [], 'No weeks because start and end date are interchanged')
 
     def test_compute_weeks_normal_result_one_week(self):
         """
@@ -66,7 +66,30 @@ class TestResource(common.TransactionCase):
 
         week_data = self.env['resource.model'].compute_weeks(start_date, end_date)
 
-        self.assertEqual(week_data[1], [{'week_num': 46, 'year': 2020}], 'Result is only one week (46)')
+        self.assertEqual(week_data, [{'week_num': 46, 'year': 2020}], 'Result is only one week (46)')
+
+    def test_create_resource_only_creates_own_weeks(self):
+        """
+        Tests if creating a resource only creates the weeks within its own timespan
+        and not the weeks between it and other resources
+
+        """
+        project = self.env['project.project'].create({'name': 'p1'})
+        employee = self.env['hr.employee'].create({'name': 'e1'})
+        self.env['resource.model'].create({'project': project.id,
+                                           'employee': employee.id,
+                                           'base_workload': 50,
+                                           'start_date': '1995-01-09 13:42:07',
+                                           'end_date': '1995-01-13 13:42:07'})
+        self.env['resource.model'].create({'project': project.id,
+                                           'employee': employee.id,
+                                           'base_workload': 50,
+                                           'start_date': '1997-01-06 13:42:07',
+                                           'end_date': '1997-01-10 13:42:07'})
+
+        week = self.env['week.model'].search([['week_num', '=', 10], ['year', '=', 1996]])
+
+        self.assertFalse(week, 'Week 10, 1996 should not have been created')
 
     # -------------------------------------------------------------------------------------------------------------------- #
 
@@ -855,6 +878,114 @@ class TestResource(common.TransactionCase):
                 self.assertEqual(model.week_num, 18, "Wrong week_num")
                 self.assertNotEqual(model.week_num, 16, "Old WeeklyResource still exists")
 
+    def test_write_resource_unrelated_field(self):
+        """
+        Tests whether write leaves the WeeklyResource models untouched
+        if neither the dates nor the base_workload changed
+
+        """
+        project = self.env['project.project'].create({'name': 'p1'})
+        employee = self.env['hr.employee'].create({'name': 'e1'})
+        values = {'project': project.id,
+                  'employee': employee.id,
+                  'base_workload': 50,
+                  'start_date': '2020-04-06 13:42:07',
+                  'end_date': '2020-04-17 13:42:07'}
+        resource = self.env['resource.model'].create(values)
+        resource.weekly_resources[0].write({'weekly_workload': 20})
+        weekly_resources = resource.weekly_resources
+
+        project2 = self.env['project.project'].create({'name': 'p2'})
+        resource.write({'project': project2.id, 'next_week': True})
+
+        self.assertEqual(resource.weekly_resources, weekly_resources, "WeeklyResources should be the same")
+        self.assertEqual(resource.weekly_resources.mapped('weekly_workload'), [20, 50],
+                         "Workloads should not be changed")
+
+    def test_write_resource_end_date_only(self):
+        """
+        Tests whether moving only the end date adds the new weeks
+        and keeps the existing WeeklyResource models
+
+        """
+        project = self.env['project.project'].create({'name': 'p1'})
+        employee = self.env['hr.employee'].create({'name': 'e1'})
+        values = {'project': project.id,
+                  'employee': employee.id,
+                  'base_workload': 50,
+                  'start_date': '2020-04-06 13:42:07',
+                  'end_date': '2020-04-10 13:42:07'}
+        resource = self.env['resource.model'].create(values)
+        weekly_resource = resource.weekly_resources
+
+        resource.write({'end_date': '2020-04-24 13:42:07'})
+
+        self.assertEqual(len(resource.weekly_resources), 3, "Resource should contain 3 WeeklyResources")
+        self.assertIn(weekly_resource, resource.weekly_resources, "Existing WeeklyResource should be kept")
+
+        resource.write({'end_date': '2020-04-15 13:42:07'})
+
+        self.assertEqual(len(resource.weekly_resources), 2, "Resource should contain 2 WeeklyResources")
+        self.assertEqual(resource.weekly_resources.mapped('week_num'), [15, 16], "Weeks should be 15 and 16")
+
+    def test_create_multiple_resources(self):
+        """
+        Tests whether creating several resources at once creates the WeeklyResource models of each resource
+
+        """
+        project = self.env['project.project'].create({'name': 'p1'})
+        employee1 = self.env['hr.employee'].create({'name': 'e1'})
+        employee2 = self.env['hr.employee'].create({'name': 'e2'})
+        resources = self.env['resource.model'].create([{'project': project.id,
+                                                        'employee': employee1.id,
+                                                        'base_workload': 50,
+                                                        'start_date': '2020-04-06 13:42:07',
+                                                        'end_date': '2020-04-17 13:42:07'},
+                                                       {'project': project.id,
+                                                        'employee': employee2.id,
+                                                        'base_workload': 30,
+                                                        'start_date': '2020-04-13 13:42:07',
+                                                        'end_date': '2020-04-30 13:42:07'}])
+
+        self.assertEqual(len(resources), 2, "Two resources should be created")
+        self.assertEqual(resources[0].weekly_resources.mapped('week_num'), [15, 16], "Weeks should be 15 and 16")
+        self.assertEqual(resources[0].weekly_resources.mapped('weekly_workload'), [50, 50],
+                         "Workloads should be 50")
+        self.assertEqual(resources[1].weekly_resources.mapped('week_num'), [16, 17, 18],
+                         "Weeks should be 16, 17 and 18")
+        self.assertEqual(resources[1].weekly_resources.mapped('weekly_workload'), [30, 30, 30],
+                         "Workloads should be 30")
+
+    def test_write_multiple_resources(self):
+        """
+        Tests whether writing several resources at once updates the WeeklyResource models of each resource
+
+        """
+        project = self.env['project.project'].create({'name': 'p1'})
+        employee = self.env['hr.employee'].create({'name': 'e1'})
+        resources = self.env['resource.model'].create([{'project': project.id,
+                                                        'employee': employee.id,
+                                                        'base_workload': 20,
+                                                        'start_date': '2020-04-06 13:42:07',
+                                                        'end_date': '2020-04-10 13:42:07'},
+                                                       {'project': project.id,
+                                                        'employee': employee.id,
+                                                        'base_workload': 30,
+                                                        'start_date': '2020-04-13 13:42:07',
+                                                        'end_date': '2020-04-24 13:42:07'}])
+
+        resources.write({'base_workload': 40, 'end_date': '2020-04-24 13:42:07'})
+
+        self.assertEqual(resources[0].weekly_resources.mapped('week_num'), [15, 16, 17],
+                         "Weeks should be 15, 16 and 17")
+        self.assertEqual(resources[1].weekly_resources.mapped('week_num'), [16, 17], "Weeks should be 16 and 17")
+        self.assertEqual(resources.mapped('weekly_resources.weekly_workload'), [40] * 5, "Workloads should be 40")
+
+        resources.write({'end_date': '2020-04-17 13:42:07'})
+
+        self.assertEqual(resources[0].weekly_resources.mapped('week_num'), [15, 16], "Weeks should be 15 and 16")
+        self.assertEqual(resources[1].weekly_resources.mapped('week_num'), [16], "Week should be 16")
+
     # -------------------------------------------------------------------------------------------------------------------- #
 
     def test_plus_one_week_normal(self):
@@ -880,6 +1011,37 @@ class TestResource(common.TransactionCase):
         self.assertEqual(current_end_date, resource.end_date, 'The resource was extended by 1 weeks')
         self.assertEqual(resource.start_date, manual_start_date, 'Start date got not changed')
 
+    def test_plus_minus_one_week_weekly_resources(self):
+        """
+        Tests if plus/minus one week only create/delete the weekly resource of the added/removed week
+        and keep the other weekly resources as they are
+
+        """
+        project = self.env['project.project'].create({'name': 'p1'})
+        employee = self.env['hr.employee'].create({'name': 'e1'})
+        values = {'project': project.id,
+                  'employee': employee.id,
+                  'base_workload': 50,
+                  'start_date': '2020-04-06 13:42:07',
+                  'end_date': '2020-04-17 13:42:07'}
+        resource = self.env['resource.model'].create(values)
+        resource.weekly_resources[0].write({'weekly_workload': 20})
+        weekly_resources = resource.weekly_resources
+
+        resource.plus_one_week()
+
+        self.assertEqual(resource.weeks_to_be_added, 1, 'weeks_to_be_added should be 1')
+        self.assertEqual(len(resource.weekly_resources), 3, 'Resource should contain 3 weekly resources')
+        self.assertEqual(resource.weekly_resources[:2], weekly_resources, 'Existing weekly resources should be kept')
+        self.assertEqual(resource.weekly_resources[2].week_num, 17, 'Added weekly resource should be in week 17')
+        self.assertEqual(resource.weekly_resources.mapped('weekly_workload'), [20, 50, 50],
+                         'Workloads should not be changed')
+
+        resource.minus_one_week()
+
+        self.assertEqual(resource.weeks_to_be_added, 0, 'weeks_to_be_added should be 0')
+        self.assertEqual(resource.weekly_resources, weekly_resources, 'Only the added weekly resource is deleted')
+
     def test_plus_one_week_normal_push_button_twice(self):
         """
             Tests plus one week method whether it adds one week to the end date
@@ -1190,6 +1352,29 @@ class TestWorkload(common.SavepointCase):
                          "The workload in week 2020, W21 is too high", "Should raise exception for Workload too high")
 
 
+    def test_create_multiple_resources_weekly_workload_too_high(self):
+        """
+        Tests if creating two resources at once in the same week with a total workload of 110
+        raises an exception.ValidationError for the workload in that week.
+
+        """
+        values = [{'project': TestWorkload.project.id,
+                   'employee': TestWorkload.employee.id,
+                   'base_workload': 50,
+                   'start_date': '2020-06-01 13:42:07',
+                   'end_date': '2020-06-12 13:42:07'},
+                  {'project': TestWorkload.project.id,
+                   'employee': TestWorkload.employee.id,
+                   'base_workload': 60,
+                   'start_date': '2020-06-08 13:42:07',
+                   'end_date': '2020-06-19 13:42:07'}]
+
+        with self.assertRaises(exceptions.ValidationError)as error:
+            self.env['resource.model'].create(values)
+
+        self.assertEqual(error.exception.name,
+                         "The workload in week 2020, W24 is too high", "Should raise exception for Workload too high")
+
 # -------------------------------------------------------------------------------------------------------------------- #
 
 
@@ -1430,3 +1615,28 @@ class TestAddDelete(common.SavepointCase):
         self.assertEqual(weekly_resources[0].week_id.week_num, 16, 'week_num should be 16')
         self.assertEqual(weekly_resources[0].week_id.year, 2020, 'year should be 2020')
         self.assertEqual(weekly_resources[0].weekly_workload, 70, 'weekly_workload should be 70')
+
+    def test_add_weeks_workload_too_high(self):
+        """
+        Test if adding weeks in which the workload is too high raises an exception
+        before any weekly_resource is created.
+
+        """
+        employee = TestAddDelete.resource.employee
+        project = self.env['project.project'].create({'name': 'p2'})
+        values = {'project': project.id,
+                  'employee': employee.id,
+                  'base_workload': 60,
+                  'start_date': '2020-04-27 13:42:07',
+                  'end_date': '2020-05-01 13:42:07'}
+        self.env['resource.model'].create(values)
+
+        project_week_data = [{'week_num': 17, 'year': 2020},
+                             {'week_num': 18, 'year': 2020}]
+
+        with self.assertRaises(exceptions.ValidationError) as error:
+            TestAddDelete.resource.add_missing_weekly_resources(project_week_data)
+
+        self.assertEqual(error.exception.name, "The workload in week 2020, W18 is too high",
+                         "Should raise exception for workload too high in week 18")
+        self.assertEqual(len(TestAddDelete.resource.weekly_resources), 1, 'resource should contain 1 weekly_resources')
@@ -1,5 +1,7 @@
 from odoo import exceptions
 from odoo.tests import common
+from odoo.tools import mute_logger
+from psycopg2 import errors
 
 
 class TestWeeklyResource(common.TransactionCase):
@@ -119,19 +121,117 @@ class TestWeeklyResource(common.TransactionCase):
 
         """
         week = self.env['week.model'].create({'week_num': 40, 'year': 2020})
-        resource = self.create_resource()
+        resource1 = self.create_resource()
+        resource2 = self.env['resource.model'].create({'project': resource1.project.id,
+                                                       'employee': resource1.employee.id,
+                                                       'base_workload': 50,
+                                                       'start_date': '2020-04-05 13:42:07',
+                                                       'end_date': '2020-04-12 13:42:07'})
         weekly_resource1 = self.env['resource.model'].add_weekly_resource(
-            {'week_id': week.id, 'resource_id': resource.id, 'weekly_workload': 70})
+            {'week_id': week.id, 'resource_id': resource1.id, 'weekly_workload': 70})
 
         weekly_resource2 = self.env['resource.model'].add_weekly_resource(
-            {'week_id': week.id, 'resource_id': resource.id, 'weekly_workload': 20})
+            {'week_id': week.id, 'resource_id': resource2.id, 'weekly_workload': 20})
 
         with self.assertRaises(exceptions.ValidationError) as error:
-            weekly_resource2.write({'week_id': week.id, 'resource_id': resource.id, 'weekly_workload': 40})
+            weekly_resource2.write({'week_id': week.id, 'resource_id': resource2.id, 'weekly_workload': 40})
 
         self.assertEqual("The workload in week " + week.week_string + " is too high", error.exception.name,
                          'Error does not match')
 
+    def test_edit_multiple_weekly_resources(self):
+        """
+        Test editing the weekly_workload of several weekly_resources at once
+        sets manually_changed on exactly the changed ones.
+
+        """
+        resource = self.create_resource()
+        resource.write({'end_date': '2020-04-26 13:42:07'})
+        weekly_resources = resource.weekly_resources
+
+        weekly_resources[:2].write({'weekly_workload': 70})
+
+        self.assertEqual(weekly_resources.mapped('weekly_workload'), [70, 70, 50, 50], 'Workloads do not match')
+        self.assertEqual(weekly_resources.mapped('manually_changed'), [True, True, False, False],
+                         'manually_changed does not match')
+
+        weekly_resources.write({'weekly_workload': 50})
+
+        self.assertEqual(weekly_resources.mapped('manually_changed'), [False, False, False, False],
+                         'manually_changed does not match')
+
+    def test_reset_manually_changed(self):
+        """
+        Test if a weekly_resource whose manually_changed is reset explicitly
+        follows the base_workload of the resource again.
+
+        """
+        resource = self.create_resource()
+        weekly_resource = resource.weekly_resources[0]
+        weekly_resource.write({'weekly_workload': 70})
+        self.assertTrue(weekly_resource.manually_changed, 'manually_changed should be set')
+
+        weekly_resource.write({'manually_changed': False})
+        resource.write({'base_workload': 40})
+
+        self.assertFalse(weekly_resource.manually_changed, 'manually_changed should not be set')
+        self.assertEqual(resource.weekly_resources.mapped('weekly_workload'), [40, 40], 'Workloads do not match')
+
+    def test_edit_multiple_weekly_resources_too_high(self):
+        """
+        Test if editing the weekly_workload of several weekly_resources at once raises an error
+        for the first week in which the total workload of the employee is larger than 100.
+
+        """
+        resource1 = self.create_resource()
+        resource1.write({'end_date': '2020-04-26 13:42:07'})
+        resource2 = self.env['resource.model'].create({'project': resource1.project.id,
+                                                       'employee': resource1.employee.id,
+                                                       'base_workload': 30,
+                                                       'start_date': '2020-04-13 13:42:07',
+                                                       'end_date': '2020-04-26 13:42:07'})
+
+        with self.assertRaises(exceptions.ValidationError) as error:
+            resource1.weekly_resources.write({'weekly_workload': 80})
+
+        self.assertEqual("The workload in week " + resource2.weekly_resources[0].week_string + " is too high",
+                         error.exception.name, 'Error does not match')
+
+    @mute_logger('odoo.sql_db')
+    def test_create_weekly_resource_twice(self):
+        """
+        Test if creating a second weekly_resource for the same resource and week is rejected.
+
+        """
+        week = self.env['week.model'].create({'week_num': 30, 'year': 2020})
+        resource = self.create_resource()
+        self.env['resource.model'].add_weekly_resource(
+            {'week_id': week.id, 'resource_id': resource.id, 'weekly_workload': 20})
+
+        with self.assertRaises(errors.UniqueViolation):
+            self.env['resource.model'].add_weekly_resource(
+                {'week_id': week.id, 'resource_id': resource.id, 'weekly_workload': 20})
+
+    def test_denormalized_fields(self):
+        """
+        Test if employee_id, project_id and yearweek are copied from the resource and the week
+        and follow changes of the resource.
+
+        """
+        resource = self.create_resource()
+        weekly_resource = resource.weekly_resources[0]
+
+        self.assertEqual(weekly_resource.employee_id, resource.employee, 'Employee does not match')
+        self.assertEqual(weekly_resource.project_id, resource.project, 'Project does not match')
+        self.assertEqual(weekly_resource.yearweek, 202014, 'yearweek does not match')
+
+        employee = self.env['hr.employee'].create({'name': 'e2'})
+        resource.write({'employee': employee.id})
+
+        self.assertEqual(weekly_resource.employee_id, employee, 'Employee does not match')
+        self.assertEqual(self.env['weekly_resource.model'].search([['employee_id', '=', employee.id]]),
+                         resource.weekly_resources, 'Weekly resources should be found by the new employee')
+
     # -----------------------------------------------------------------------------------------------------------------------
 
     def test_name_get(self):
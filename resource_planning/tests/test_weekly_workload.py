@@ -0,0 +1,125 @@
+from odoo import exceptions
+
+from .common import WorkloadTransactionCase
+
+
+class TestWeeklyWorkload(WorkloadTransactionCase):
+    """
+    Class to test the WeeklyWorkload class in the default and in the sparse mode
+    """
+
+    def set_sparse_mode(self):
+        """
+        Sets the sparse mode for the test
+
+        """
+        self.env['ir.config_parameter'].sudo().set_param('resource_planning.sparse_weekly_resources', True)
+
+    def test_default_mode(self):
+        """
+        Tests if the weekly workloads are the weekly_resources in the default mode
+
+        """
+        employee = self.env['hr.employee'].create({'name': 'e1'})
+        resource = self.create_resource(employee, 30, '2020-04-06 13:42:07', '2020-04-24 13:42:07')
+        resource.weekly_resources[0].write({'weekly_workload': 50})
+
+        weekly_workloads = self.env['weekly_workload.model'].search([['resource_id', '=', resource.id]])
+
+        self.assertEqual(weekly_workloads.mapped('weekly_resource_id'), resource.weekly_resources,
+                         "Weekly workloads should be the weekly_resources")
+        self.assertEqual(weekly_workloads.mapped('weekly_workload'), [50, 30, 30], "Workloads do not match")
+
+    def test_sparse_mode_create(self):
+        """
+        Tests if creating a resource in the sparse mode stores no weekly_resources,
+        but derives the weekly workloads and total workloads from the timespan
+
+        """
+        self.set_sparse_mode()
+        employee = self.env['hr.employee'].create({'name': 'e1'})
+        resource = self.create_resource(employee, 30, '2020-04-06 13:42:07', '2020-04-24 13:42:07')
+        week = self.env['week.model'].resolve_week(2020, 16)
+
+        weekly_workloads = self.env['weekly_workload.model'].search([['resource_id', '=', resource.id]])
+
+        self.assertFalse(resource.weekly_resources, "No weekly_resources should be stored")
+        self.assertEqual(weekly_workloads.mapped('week_string'), ['2020, W15', '2020, W16', '2020, W17'],
+                         "Weeks do not match")
+        self.assertEqual(weekly_workloads.mapped('weekly_workload'), [30, 30, 30], "Workloads do not match")
+        self.assertEqual(self.get_total_workload(employee, week), 30, "Total workload should be 30 %")
+
+    def test_sparse_mode_override(self):
+        """
+        Tests if a changed week is stored as weekly_resource in the sparse mode
+        and keeps its workload when the base_workload is changed
+
+        """
+        self.set_sparse_mode()
+        employee = self.env['hr.employee'].create({'name': 'e1'})
+        resource = self.create_resource(employee, 30, '2020-04-06 13:42:07', '2020-04-24 13:42:07')
+        week = self.env['week.model'].resolve_week(2020, 16)
+        weekly_workload = self.env['weekly_workload.model'].search([['resource_id', '=', resource.id],
+                                                                    ['week_id', '=', week.id]])
+
+        action = weekly_workload.open_weekly_resource()
+        self.env['weekly_resource.model'].browse(action['res_id']).write({'weekly_workload': 60})
+        resource.write({'base_workload': 40})
+
+        weekly_workloads = self.env['weekly_workload.model'].search([['resource_id', '=', resource.id]])
+
+        self.assertEqual(len(resource.weekly_resources), 1, "Only the changed week should be stored")
+        self.assertEqual(weekly_workloads.mapped('weekly_workload'), [40, 60, 40], "Workloads do not match")
+        self.assertEqual(self.get_total_workload(employee, week), 60, "Total workload should be 60 %")
+
+    def test_sparse_mode_move_end_date(self):
+        """
+        Tests if moving the end date in the sparse mode updates the total workloads
+
+        """
+        self.set_sparse_mode()
+        employee = self.env['hr.employee'].create({'name': 'e1'})
+        resource = self.create_resource(employee, 30, '2020-04-06 13:42:07', '2020-04-24 13:42:07')
+        week = self.env['week.model'].resolve_week(2020, 17)
+
+        resource.write({'end_date': '2020-04-17 13:42:07'})
+        self.assertEqual(self.get_total_workload(employee, week), 0, "Total workload should be 0 %")
+
+        resource.plus_one_week()
+        self.assertEqual(self.get_total_workload(employee, week), 30, "Total workload should be 30 %")
+
+    def test_sparse_mode_workload_too_high(self):
+        """
+        Tests if the total workload of an employee is checked in the sparse mode
+
+        """
+        self.set_sparse_mode()
+        employee = self.env['hr.employee'].create({'name': 'e1'})
+        self.create_resource(employee, 50, '2020-04-06 13:42:07', '2020-04-24 13:42:07')
+
+        with self.assertRaises(exceptions.ValidationError) as error:
+            self.create_resource(employee, 60, '2020-04-20 13:42:07', '2020-05-01 13:42:07')
+
+        self.assertEqual(error.exception.name, "The workload in week 2020, W17 is too high", "Error does not match")
+
+    def test_sparse_mode_switch_off(self):
+        """
+        Tests if switching the sparse mode off stores the derived weeks as weekly_resources
+        and keeps the changed weeks and the total workloads
+
+        """
+        self.set_sparse_mode()
+        employee = self.env['hr.employee'].create({'name': 'e1'})
+        resource = self.create_resource(employee, 30, '2020-04-06 13:42:07', '2020-04-24 13:42:07')
+        week = self.env['week.model'].resolve_week(2020, 16)
+        weekly_workload = self.env['weekly_workload.model'].search([['resource_id', '=', resource.id],
+                                                                    ['week_id', '=', week.id]])
+        action = weekly_workload.open_weekly_resource()
+        self.env['weekly_resource.model'].browse(action['res_id']).write({'weekly_workload': 60})
+
+        self.env['res.config.settings'].create({'sparse_weekly_resources': False}).set_values()
+
+        self.assertFalse(self.env['weekly_workload.model'].is_sparse_mode(), "Sparse mode should be off")
+        self.assertEqual(resource.weekly_resources.sorted('yearweek').mapped('weekly_workload'), [30, 60, 30],
+                         "All weeks should be stored")
+        self.assertEqual(self.get_total_workload(employee, week), 60, "Total workload should be 60 %")
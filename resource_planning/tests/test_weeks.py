@@ -1,7 +1,7 @@
 from datetime import datetime, timedelta
 
 from odoo.tests import common
-from odoo import exceptions
+from odoo import exceptions, fields
 
 
 class TestWeeks(common.TransactionCase):
@@ -372,6 +372,29 @@ class TestWeeks(common.TransactionCase):
                 self.assertTrue(week.week_bool,
                                 "Week_bool is true therefore week is before this week, lies within week delta")
 
+    # -----------------------------------------------------------------------------------------------------------------------
+    def test_search_week_bool(self):
+        """
+        Tests if week_bool is computed and searched from the current date and filter_weeks
+
+        """
+        self.env['ir.config_parameter'].sudo().set_param('resource_planning.filter_weeks', 2)
+        today = fields.Date.today()
+        this_week = self.env['week.model'].create_missing_weeks([{'week_num': today.isocalendar()[1],
+                                                                  'year': today.isocalendar()[0]}])
+        old_week = self.env['week.model'].create({'week_num': 10, 'year': 1985})
+
+        self.assertTrue(this_week.week_bool, "Week_bool is true therefore week is this week")
+        self.assertFalse(old_week.week_bool, "Week_bool is false therefore week is before this week")
+
+        weeks = self.env['week.model'].search([('week_bool', '=', True)])
+        self.assertIn(this_week, weeks, "This week should be found")
+        self.assertNotIn(old_week, weeks, "Old week should not be found")
+
+        weeks = self.env['week.model'].search([('week_bool', '=', False)])
+        self.assertNotIn(this_week, weeks, "This week should not be found")
+        self.assertIn(old_week, weeks, "Old week should be found")
+
     # -----------------------------------------------------------------------------------------------------------------------
     def test_build_week_string_one_digit(self):
         """
@@ -434,3 +457,170 @@ class TestWeeks(common.TransactionCase):
         })
 
         self.assertEqual(week.week_string, "2020, W09", "Week string should be '2020, W09'")
+
+    def test_build_yearweek(self):
+        """
+        Tests if the yearweek is built and the weeks are ordered by it
+
+        """
+        week1 = self.env['week.model'].create({'week_num': 2, 'year': 1986})
+        week2 = self.env['week.model'].create({'week_num': 52, 'year': 1985})
+
+        self.assertEqual(week1.yearweek, 198602, "yearweek should be 198602")
+        self.assertEqual(self.env['week.model'].search([['id', 'in', (week1 | week2).ids]]).ids, [week2.id, week1.id],
+                         "Week 1985, W52 should be ordered before 1986, W02")
+
+    def test_build_week_dates(self):
+        """
+        Tests if date_start and date_end are the monday and sunday of the ISO week,
+        also in a year starting on a friday
+
+        """
+        week = self.env['week.model'].create({'week_num': 1, 'year': 2021})
+
+        self.assertEqual(week.date_start, fields.Date.to_date('2021-01-04'), "date_start should be 2021-01-04")
+        self.assertEqual(week.date_end, fields.Date.to_date('2021-01-10'), "date_end should be 2021-01-10")
+
+    def test_create_missing_weeks_dates(self):
+        """
+        Tests if create_missing_weeks stores the same dates as the ORM
+
+        """
+        weeks = self.env['week.model'].create_missing_weeks([{'week_num': 53, 'year': 1987},
+                                                             {'week_num': 1, 'year': 1988}])
+
+        self.assertEqual(weeks.mapped('date_start'), [fields.Date.to_date('1987-12-28'),
+                                                      fields.Date.to_date('1988-01-04')], "date_start does not match")
+        self.assertEqual(weeks.mapped('date_end'), [fields.Date.to_date('1988-01-03'),
+                                                    fields.Date.to_date('1988-01-10')], "date_end does not match")
+
+    # -----------------------------------------------------------------------------------------------------------------------
+    def test_create_missing_weeks(self):
+        """
+        Tests if create_missing_weeks creates all missing weeks and
+        returns the existing and the newly created weeks
+
+        """
+        existing = self.env['week.model'].create({
+            'week_num': 30,
+            'year': 1985
+        })
+
+        weeks = self.env['week.model'].create_missing_weeks([{'week_num': 30, 'year': 1985},
+                                                             {'week_num': 31, 'year': 1985},
+                                                             {'week_num': 32, 'year': 1985}])
+
+        self.assertEqual(len(weeks), 3, "Should return 3 weeks")
+        self.assertIn(existing, weeks, "Existing week should be returned")
+        self.assertEqual(self.env['week.model'].search_count([['year', '=', 1985]]), 3,
+                         "Existing week should not be created a second time")
+        self.assertEqual(sorted(weeks.mapped('week_string')), ['1985, W30', '1985, W31', '1985, W32'],
+                         "Week strings should be set")
+        self.assertEqual(weeks.mapped('yearweek'), [198530, 198531, 198532], "yearweeks should be set")
+
+    def test_create_missing_weeks_not_cached(self):
+        """
+        Tests if the weeks created by create_missing_weeks are returned, but not cached
+        before the transaction is committed
+
+        """
+        weeks = self.env['week.model'].create_missing_weeks([{'week_num': 33, 'year': 1985},
+                                                             {'week_num': 33, 'year': 1985}])
+
+        self.assertEqual(len(weeks), 2, "Should return the week for every entry")
+        self.assertEqual(weeks[0], weeks[1], "Should create the week once")
+        self.assertNotIn((1985, 33), self.env['week.model'].get_week_id_map(),
+                         "Uncommitted week should not be cached")
+        self.assertEqual(self.env['week.model'].resolve_week(1985, 33), weeks[0], "Should resolve the created week")
+
+    def test_create_missing_weeks_invalid_week(self):
+        """
+        Tests if create_missing_weeks raises an exception for an invalid week number
+
+        """
+        with self.assertRaises(exceptions.ValidationError):
+            self.env['week.model'].create_missing_weeks([{'week_num': 54, 'year': 1985}])
+
+    # -----------------------------------------------------------------------------------------------------------------------
+    def test_resolve_week(self):
+        """
+        Tests if resolve_week returns the correct week model
+
+        """
+        week = self.env['week.model'].create({
+            'week_num': 12,
+            'year': 1985
+        })
+
+        self.assertEqual(self.env['week.model'].resolve_week(1985, 12), week, "Should resolve week 12, 1985")
+        self.assertFalse(self.env['week.model'].resolve_week(1985, 13), "Week 13, 1985 does not exist")
+
+    def test_resolve_week_after_create_and_unlink(self):
+        """
+        Tests if the cache of resolve_week is invalidated when weeks are created or unlinked
+
+        """
+        self.assertFalse(self.env['week.model'].resolve_week(1985, 14), "Week 14, 1985 does not exist yet")
+
+        week = self.env['week.model'].create({
+            'week_num': 14,
+            'year': 1985
+        })
+        self.assertEqual(self.env['week.model'].resolve_week(1985, 14), week, "Should resolve the created week")
+
+        week.unlink()
+        self.assertFalse(self.env['week.model'].resolve_week(1985, 14), "Week 14, 1985 was deleted")
+
+    def test_resolve_weeks(self):
+        """
+        Tests if resolve_weeks returns the existing weeks in the given order
+
+        """
+        week1 = self.env['week.model'].create({
+            'week_num': 20,
+            'year': 1985
+        })
+        week2 = self.env['week.model'].create({
+            'week_num': 21,
+            'year': 1985
+        })
+
+        weeks = self.env['week.model'].resolve_weeks([{'week_num': 21, 'year': 1985},
+                                                      {'week_num': 22, 'year': 1985},
+                                                      {'week_num': 20, 'year': 1985}])
+
+        self.assertEqual(weeks.ids, [week2.id, week1.id], "Should resolve the existing weeks in order")
+
+    # -----------------------------------------------------------------------------------------------------------------------
+    def test_provision_calendar(self):
+        """
+        Tests if provision_calendar creates all weeks from the year before until the year after the current year
+
+        """
+        ICPSudo = self.env['ir.config_parameter'].sudo()
+        ICPSudo.set_param('resource_planning.calendar_years_ahead', 1)
+        ICPSudo.set_param('resource_planning.calendar_years_back', 1)
+
+        weeks = self.env['week.model'].provision_calendar()
+
+        year = fields.Date.today().year
+        self.assertEqual(weeks[0].week_num, 1, "First provisioned week should be week 1")
+        self.assertEqual(weeks[0].year, year - 1, "First provisioned week should be in the last year")
+        self.assertEqual(weeks[-1].year, year + 1, "Last provisioned week should be in the next year")
+        self.assertIn(weeks[-1].week_num, [52, 53], "Last provisioned week should be the last week of the year")
+        self.assertEqual(self.env['week.model'].search_count([['year', '>=', year - 1], ['year', '<=', year + 1]]),
+                         len(weeks), "All weeks of the timespan should exist")
+
+    def test_provision_calendar_twice(self):
+        """
+        Tests if calling provision_calendar twice doesn't create any week twice
+
+        """
+        ICPSudo = self.env['ir.config_parameter'].sudo()
+        ICPSudo.set_param('resource_planning.calendar_years_ahead', 0)
+        ICPSudo.set_param('resource_planning.calendar_years_back', 0)
+
+        weeks1 = self.env['week.model'].provision_calendar()
+        weeks2 = self.env['week.model'].provision_calendar()
+
+        self.assertEqual(weeks1, weeks2, "Should return the same weeks")
@@ -11,6 +11,8 @@
         The assigned resources during a user-selected time can be exported in PDF-Format.
         The resources are displayed in a clear table similar to the overview in resource_planning module.
         The total workload per week is calculated and displayed at the bottom of the table.
+        The same table can be exported as CSV or Excel (XLSX) file.
+        Large reports can be generated in the background, the user is notified when they are ready.
     """,
 
     'author': "Cyrill Rohrbach, Gillian Cathomas, Sophie Pfister, Joel Hari, Jonas Ph. Kocher",
@@ -26,11 +28,18 @@
     'depends': ['base',
                 'hr',
                 'project',
+                'mail',
                 'resource_planning'],
 
     # always loaded
     'data': [
-        'views/report_wizard.xml'
+        'security/ir.model.access.csv',
+        'security/security.xml',
+        'views/report_wizard.xml',
+        'views/report_job.xml',
+        'views/res_config_settings_views.xml',
+        'data/default_settings.xml',
+        'data/ir_cron.xml'
     ],
     # only loaded in demonstration mode
     'demo': [],
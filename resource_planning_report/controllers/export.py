@@ -0,0 +1,85 @@
+import tempfile
+
+from werkzeug.exceptions import NotFound
+
+import odoo
+from odoo import api, http
+from odoo.http import request, content_disposition
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+CONTENT_TYPES = {
+    'csv': 'text/csv;charset=utf8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+# size of the parts the xlsx file is sent in
+CHUNK_SIZE = 64 * 1024
+
+
+class ReportExport(http.Controller):
+    """
+    Streams the planning report (project x employee x week) as CSV or XLSX.
+    Opened by the report wizard if the user chooses one of these formats.
+
+    The rows are generated in batches from a cursor declared in the transaction
+    (ReportView.iter_workload_rows), so the memory use doesn't grow with the time span or the number of employees.
+    The response is sent after the request's cursor is closed, so the rows are read with an own cursor.
+    The access to the weekly workloads is checked before the response is started.
+
+    """
+
+    @http.route('/resource_planning_report/export/<int:wizard_id>/<string:export_format>',
+                type='http', auth='user')
+    def export(self, wizard_id, export_format, **kwargs):
+        """
+        :param wizard_id: id of the report wizard with the user-selected time span
+        :param export_format: 'csv' or 'xlsx'
+        :return: the streamed file
+        :raises:
+            :exception AccessError: if the user may not read the weekly workloads
+        """
+        wizard = request.env['resource.planning.report.wizard'].browse(wizard_id).exists()
+        if not wizard or export_format not in CONTENT_TYPES:
+            raise NotFound()
+        if export_format == 'xlsx' and not xlsxwriter:
+            raise NotFound()
+        request.env['weekly_workload.model'].check_access_rights('read')
+
+        weeks = wizard.get_weeks()
+        generate = self.generate_csv if export_format == 'csv' else self.generate_xlsx
+
+        return request.make_response(
+            generate(request.db, request.uid, dict(request.context), weeks),
+            headers=[('Content-Type', CONTENT_TYPES[export_format]),
+                     ('Content-Disposition', content_disposition('Resource Planning Report.' + export_format))])
+
+    def generate_csv(self, db, uid, context, weeks):
+        """
+        :return: generator of the encoded csv file, one line at a time (ReportView.iter_csv)
+        """
+        with api.Environment.manage(), odoo.registry(db).cursor() as cr:
+            env = api.Environment(cr, uid, context)
+            for line in env['report.resource_planning_report.planning_report_view'].iter_csv(weeks):
+                yield line
+
+    def generate_xlsx(self, db, uid, context, weeks):
+        """
+        The xlsx file can only be sent when it is complete,
+        so it is written to a temporary file first and sent in parts.
+
+        :return: generator of the xlsx file in parts of CHUNK_SIZE
+        """
+        with tempfile.TemporaryFile() as file:
+            with api.Environment.manage(), odoo.registry(db).cursor() as cr:
+                env = api.Environment(cr, uid, context)
+                env['report.resource_planning_report.planning_report_view'].write_export(weeks, 'xlsx', file)
+
+            file.seek(0)
+            chunk = file.read(CHUNK_SIZE)
+            while chunk:
+                yield chunk
+                chunk = file.read(CHUNK_SIZE)
@@ -2,3 +2,6 @@
 
 from . import report_view
 from . import report_wizard
+from . import report_job
+from . import ir_actions_report
+from . import res_config_settings
@@ -0,0 +1,65 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from odoo import models, api
+from odoo.tools.pdf import merge_pdf
+
+
+class IrActionsReport(models.Model):
+    """
+    Extends ir.actions.report to render the sections of the planning report in parallel.
+    Every chunk of rows of the planning report is an own section (div.article, see ReportView.split_into_chunks).
+    The sections are split into as many parts as set on the settings page (report_pdf_workers),
+    every part is rendered by an own wkhtmltopdf process and the parts are merged into one PDF.
+
+    """
+    _inherit = 'ir.actions.report'
+
+    @api.model
+    def get_pdf_worker_count(self):
+        """
+        :return: the number of wkhtmltopdf processes rendering the planning report (set on the settings page),
+                 at least 1
+        """
+        workers = self.env['ir.config_parameter'].sudo().get_param('resource_planning_report.report_pdf_workers', 1)
+        return max(int(workers), 1)
+
+    @api.model
+    def split_bodies(self, bodies, parts):
+        """
+        Splits the sections of a report into consecutive parts of about the same size
+
+        :param bodies: the html of the sections of the report
+        :param parts: the maximal number of parts
+        :return: list of lists of sections, in the order of the report
+        """
+        size = -(-len(bodies) // parts)
+        return [bodies[i:i + size] for i in range(0, len(bodies), size)]
+
+    def _run_wkhtmltopdf(self, bodies, header=None, footer=None, landscape=False,
+                         specific_paperformat_args=None, set_viewport_size=False):
+        """
+        Renders the sections of the planning report in parallel wkhtmltopdf processes and merges them.
+        Every other report, and the planning report with a single worker, is rendered as before.
+
+        :return: the content of the pdf
+        """
+        workers = self.get_pdf_worker_count()
+        if self.report_name != 'resource_planning_report.planning_report_view' or workers == 1 or len(bodies) < 2:
+            return super(IrActionsReport, self)._run_wkhtmltopdf(
+                bodies, header=header, footer=footer, landscape=landscape,
+                specific_paperformat_args=specific_paperformat_args, set_viewport_size=set_viewport_size)
+
+        # the paperformat is read before the threads start, so they only read it from the cache
+        self.get_paperformat().read()
+        run_wkhtmltopdf = super(IrActionsReport, self)._run_wkhtmltopdf
+
+        def render(part):
+            return run_wkhtmltopdf(part, header=header, footer=footer, landscape=landscape,
+                                   specific_paperformat_args=specific_paperformat_args,
+                                   set_viewport_size=set_viewport_size)
+
+        parts = self.split_bodies(bodies, workers)
+        with ThreadPoolExecutor(max_workers=len(parts)) as executor:
+            contents = list(executor.map(render, parts))
+
+        return merge_pdf(contents)
@@ -0,0 +1,222 @@
+import base64
+import datetime
+import logging
+import tempfile
+import threading
+
+from odoo import models, fields, api, registry
+
+_logger = logging.getLogger(__name__)
+
+# number of times a job is started before it is marked as failed
+MAX_ATTEMPTS = 3
+
+
+class ReportJob(models.Model):
+    """
+    A planning report generated in the background.
+    Created by the report wizard if the user chooses to generate the report in the background.
+
+    The jobs are processed by a scheduled action (run_jobs) in the order they were created.
+    The generated file is stored as attachment of the job and the user is notified when it is ready.
+    The number of jobs processed at the same time is configured on the settings page (report_job_workers).
+
+    A job is claimed (state running) in an own transaction before it is generated. If its worker is killed,
+    e.g. by the time or memory limits, the job stays running. After report_job_timeout minutes it is
+    pending again, until it was started MAX_ATTEMPTS times, then it is marked as failed.
+
+    """
+    _name = 'resource.planning.report.job'
+    _description = 'Resource Planning Report Job'
+    _inherit = ['mail.thread']
+    _order = 'id desc'
+
+    name = fields.Char(string='Name', compute='build_name', store=True)
+    user_id = fields.Many2one('res.users', 'User', required=True, default=lambda self: self.env.user,
+                              readonly=True)
+    start_week = fields.Many2one('week.model', 'Start Week', required=True, readonly=True)
+    end_week = fields.Many2one('week.model', 'End Week', required=True, readonly=True)
+    export_format = fields.Selection([('pdf', 'PDF'), ('csv', 'CSV'), ('xlsx', 'Excel (XLSX)')],
+                                     string='Format', required=True, default='pdf', readonly=True)
+    state = fields.Selection([('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'),
+                              ('failed', 'Failed')],
+                             string='State', required=True, default='pending', readonly=True, tracking=True)
+    attempts = fields.Integer(string='Attempts', default=0, readonly=True)
+    started_at = fields.Datetime(string='Started At', readonly=True)
+    attachment_id = fields.Many2one('ir.attachment', 'Report', readonly=True)
+    error = fields.Text(string='Error', readonly=True)
+
+    @api.depends('start_week', 'end_week')
+    def build_name(self):
+        """
+        Builds the name of the report out of its time span
+        """
+        for job in self:
+            job.name = "Resource Planning Report %s - %s" % (job.start_week.week_string or '',
+                                                             job.end_week.week_string or '')
+
+    @api.model
+    def get_worker_count(self):
+        """
+        :return: the number of jobs processed at the same time (set on the settings page), at least 1
+        """
+        workers = self.env['ir.config_parameter'].sudo().get_param('resource_planning_report.report_job_workers', 1)
+        return max(int(workers), 1)
+
+    @api.model
+    def get_timeout(self):
+        """
+        :return: the time after which a running job is considered interrupted (set in ir.config_parameter)
+        """
+        timeout = self.env['ir.config_parameter'].sudo().get_param('resource_planning_report.report_job_timeout', 60)
+        return datetime.timedelta(minutes=int(timeout))
+
+    @api.model
+    def run_jobs(self):
+        """
+        Called by the scheduled action.
+        Requeues the interrupted jobs and processes the pending jobs with as many threads as defined by
+        get_worker_count, every thread processes one job after the other until none is left.
+
+        """
+        self.requeue_interrupted_jobs()
+        # the workers use their own cursors, so they only see the requeued jobs once they are committed
+        self.flush()
+        self.env.cr.commit()
+
+        threads = [threading.Thread(target=self.run_worker, args=(self.env.cr.dbname,))
+                   for i in range(self.get_worker_count())]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    @api.model
+    def requeue_interrupted_jobs(self):
+        """
+        Sets the jobs which are running for longer than the timeout back to pending,
+        or marks them as failed if they were already started MAX_ATTEMPTS times.
+
+        """
+        self.env.cr.execute("""
+            SELECT id FROM resource_planning_report_job
+            WHERE state = 'running' AND started_at < %s
+            FOR UPDATE SKIP LOCKED
+        """, [fields.Datetime.now() - self.get_timeout()])
+        jobs = self.browse([row[0] for row in self.env.cr.fetchall()])
+
+        for job in jobs:
+            if job.attempts >= MAX_ATTEMPTS:
+                job.mark_failed("The report was interrupted %s times, it is probably too large" % job.attempts)
+            else:
+                job.state = 'pending'
+
+    @api.model
+    def claim_job(self):
+        """
+        Claims the oldest pending job. The job is locked with SKIP LOCKED,
+        so the workers never wait for each other and never claim the same job.
+
+        :return: the claimed job (state running) or an empty recordset if no job is pending
+        """
+        self.env.cr.execute("""
+            SELECT id FROM resource_planning_report_job
+            WHERE state = 'pending'
+            ORDER BY id
+            LIMIT 1
+            FOR UPDATE SKIP LOCKED
+        """)
+        row = self.env.cr.fetchone()
+        job = self.browse(row[0] if row else [])
+        if job:
+            job.write({'state': 'running', 'attempts': job.attempts + 1, 'started_at': fields.Datetime.now()})
+        return job
+
+    @api.model
+    def run_worker(self, dbname):
+        """
+        Claims and processes pending jobs until none is left.
+        The claim is committed before the job is generated, so an interrupted job stays running
+        and is not claimed again before it is requeued (requeue_interrupted_jobs).
+        A job which raises an error is marked as failed.
+
+        :param dbname: the name of the database, every worker uses its own cursor
+        """
+        with api.Environment.manage():
+            while True:
+                with registry(dbname).cursor() as cr:
+                    env = api.Environment(cr, self.env.uid, self.env.context)
+                    job = env['resource.planning.report.job'].claim_job()
+                    if not job:
+                        return
+                    job.flush()
+                    cr.commit()
+
+                    try:
+                        job.run_job()
+                        job.flush()
+                        cr.commit()
+                    except Exception as error:
+                        _logger.exception("Resource planning report job %s failed", job.id)
+                        cr.rollback()
+                        # the changes of the failed job are rolled back, so they are dropped from the cache as well
+                        env.clear()
+                        job.mark_failed(str(error))
+                        job.flush()
+
+    def mark_failed(self, error):
+        """
+        Marks the job as failed and notifies the user
+
+        :param error: the reason why the report could not be generated
+        """
+        self.ensure_one()
+        self.write({'state': 'failed', 'error': error})
+        self.message_post(body="The report could not be generated.",
+                          partner_ids=self.user_id.partner_id.ids,
+                          subtype='mail.mt_comment')
+
+    def run_job(self):
+        """
+        Generates the report of the job as its user, stores it as attachment of the job
+        and notifies the user.
+
+        """
+        self.ensure_one()
+
+        wizard = self.env['resource.planning.report.wizard'].with_user(self.user_id).create({
+            'start_week': self.start_week.id,
+            'end_week': self.end_week.id,
+            'export_format': self.export_format,
+        })
+        weeks = wizard.get_weeks()
+
+        if self.export_format == 'pdf':
+            data = {
+                'model': wizard._name,
+                'ids': wizard.ids,
+                'form': {
+                    'weeks': weeks
+                },
+            }
+            report = self.env.ref('resource_planning_report.planning_report').with_user(self.user_id)
+            content, extension = report.render_qweb_pdf(wizard.ids, data=data)
+        else:
+            with tempfile.TemporaryFile() as file:
+                self.env['report.resource_planning_report.planning_report_view'].with_user(self.user_id) \
+                    .write_export(weeks, self.export_format, file)
+                file.seek(0)
+                content = file.read()
+            extension = self.export_format
+
+        attachment = self.env['ir.attachment'].create({
+            'name': "%s.%s" % (self.name, extension),
+            'datas': base64.b64encode(content),
+            'res_model': self._name,
+            'res_id': self.id,
+        })
+        self.write({'state': 'done', 'attachment_id': attachment.id})
+        self.message_post(body="The report is ready.",
+                          partner_ids=self.user_id.partner_id.ids,
+                          attachment_ids=attachment.ids,
+                          subtype='mail.mt_comment')
@@ -1,6 +1,16 @@
-from datetime import datetime, timedelta
+import csv
+import io
+import itertools
 
-from odoo import models, fields, api
+from odoo import models, api, exceptions
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+# number of rows fitting on a page of the report
+CHUNK_ROWS = 25
 
 
 class ReportView(models.AbstractModel):
@@ -14,12 +24,14 @@ class ReportView(models.AbstractModel):
     @api.model
     def _get_report_values(self, docids, data=None):
         """
-        Computes the data for the report by going through all weekly_resource-models,
-        trying to match them with the user-selected time span and gathering the relevant data.
+        Computes the data for the report with one grouped aggregate of the weekly workloads
+        per project, employee and week, restricted to the user-selected time span.
+        Only projects and employees with a workload in the time span are part of the report.
 
         :param docids: the doc_id to be concatenated to the file name, passed on from report_wizard
         :param data: passed on from the report_wizard
-        :return: the required data for report
+        :return: the required data for report, one doc per project and employee with its workloads
+                 in the order of the weeks and its total, and the totals of all docs per week
         """
         weeks = data['form']['weeks']
         length = len(weeks)
@@ -27,77 +39,201 @@ class ReportView(models.AbstractModel):
         # result
         docs = []
 
-        # Get a list  of all projects and employees
-        projects = self.env['project.project'].search([])
-        employees = self.env['hr.employee'].search([])
-
-        # Iterate through projects and employees
-        for project in projects:
-            for employee in employees:
-                weekly_resource = self.env['weekly_resource.model'].search([
-                    ['project', '=', project.id], ['employee', '=', employee.id]])
-
-                # iterate through week-span
-                week_array = []
-                for i in range(length):
-                    is_set = False
-                    # look for matching weekly_resources
-                    for res in weekly_resource:
-                        if res.week_string == weeks[i]:
-                            # check whether there already is an element with this week_string and delete it
-                            for week_data in week_array:
-                                if res.week_string == week_data['week']:
-                                    week_array.remove(week_data)
-                            # add workload to to the resources week_array
-                            week_array.append({'week': weeks[i],
-                                               'workload': res.weekly_workload})
-                            is_set = True
-                        # else: set up resource with workload 0 and add it to the week_array
-                        elif not is_set:
-                            week_array.append({'week': weeks[i],
-                                               'workload': 0})
-                            is_set = True
-
-                # add relevant data to docs
-                if self.is_relevant(week_array):
-                    docs.append({'project': project.name,
-                                 'employee': employee.name,
-                                 'weekly_data': week_array
-                                 })
+        week_models = self.env['week.model'].search([['week_string', 'in', weeks]])
+        week_index = {week.id: weeks.index(week.week_string) for week in week_models}
+
+        # the weekly workloads are read from a SQL view, so pending changes have to be written first
+        self.env['resource.model'].flush()
+        self.env['weekly_resource.model'].flush()
+
+        # grouped by project and employee in the order of their models
+        groups = self.env['weekly_workload.model'].read_group(
+            [['week_id', 'in', week_models.ids]],
+            ['project_id', 'employee_id', 'week_id', 'weekly_workload'],
+            ['project_id', 'employee_id', 'week_id'], lazy=False)
+
+        rows = {}
+        for group in groups:
+            if not group['weekly_workload']:
+                continue
+            key = (group['project_id'][0], group['employee_id'][0])
+            if key not in rows:
+                rows[key] = {'project': group['project_id'][1],
+                             'employee': group['employee_id'][1],
+                             'workloads': [0] * length,
+                             'total': 0}
+                docs.append(rows[key])
+            rows[key]['workloads'][week_index[group['week_id'][0]]] += group['weekly_workload']
+            rows[key]['total'] += group['weekly_workload']
 
         # Calculate the total for each week
-        week_array = []
-        for week in weeks:
-            weekly_total = 0
-            for doc in docs:
-                for weekly_data in doc['weekly_data']:
-                    if week == weekly_data['week']:
-                        weekly_total = weekly_total + weekly_data['workload']
-            week_array.append({'week': week,
-                               'workload': weekly_total
-                               })
-        # Add total to docs
-        docs.append({'project': ' ',
-                     'employee': 'Total',
-                     'weekly_data': week_array
-                     })
+        totals = [0] * length
+        for doc in docs:
+            for i, workload in enumerate(doc['workloads']):
+                totals[i] += workload
 
         return {
             'doc_ids': data['ids'],
             'doc_model': data['model'],
             'weeks': weeks,
             'docs': docs,
+            'chunks': self.split_into_chunks(docs),
+            'totals': totals,
+            'total': sum(totals),
         }
 
-    def is_relevant(self, week_array):
+    @api.model
+    def split_into_chunks(self, docs, size=CHUNK_ROWS):
+        """
+        Splits the rows of the report into page-sized chunks, each rendered as own section (div.article).
+        The rows of a project are kept together, unless they don't fit on one page.
+        The sections can be rendered in parallel (see IrActionsReport).
+
+        :param docs: the rows of the report, ordered by project
+        :param size: the maximum number of rows of a chunk
+        :return: list of lists of rows
+        """
+        chunks = []
+        chunk = []
+        for project, project_docs in itertools.groupby(docs, key=lambda doc: doc['project']):
+            project_docs = list(project_docs)
+            if chunk and len(chunk) + len(project_docs) > size:
+                chunks.append(chunk)
+                chunk = []
+            for doc in project_docs:
+                if len(chunk) == size:
+                    chunks.append(chunk)
+                    chunk = []
+                chunk.append(doc)
+        if chunk:
+            chunks.append(chunk)
+
+        return chunks
+
+    @api.model
+    def iter_workload_rows(self, weeks, itersize=1000):
+        """
+        Yields the same rows as _get_report_values one by one, for the exports of the report.
+        The weekly workloads are aggregated by the database and fetched in batches of itersize
+        through a cursor declared in the transaction (DECLARE / FETCH), so only one batch is kept in memory at a time.
+        The rows are read with SQL, so the read access to the weekly workloads is checked first.
+
+        :param weeks: the week-strings of the time span, in chronological order
+        :param itersize: the number of aggregated workloads fetched per round trip
+        :return: generator of dicts with the project, the employee, the workloads in the order of the weeks
+                 and their total
+        :raises:
+            :exception AccessError: if the user may not read the weekly workloads
+        """
+        self.env['weekly_workload.model'].check_access_rights('read')
+
+        length = len(weeks)
+        week_models = self.env['week.model'].search([['week_string', 'in', weeks]])
+        week_index = {week.id: weeks.index(week.week_string) for week in week_models}
+        if not week_models:
+            return
+
+        self.env['resource.model'].flush()
+        self.env['weekly_resource.model'].flush()
+
+        # same order as read_group on the project and employee models
+        self.env.cr.execute("""
+            DECLARE planning_report_rows NO SCROLL CURSOR FOR
+            SELECT p.id, p.name, e.id, e.name, ww.week_id, SUM(ww.weekly_workload)
+            FROM weekly_workload_model ww
+            JOIN project_project p ON p.id = ww.project_id
+            JOIN hr_employee e ON e.id = ww.employee_id
+            WHERE ww.week_id IN %s
+            GROUP BY p.id, p.sequence, p.name, e.id, e.name, ww.week_id
+            HAVING SUM(ww.weekly_workload) != 0
+            ORDER BY p.sequence, p.name, p.id, e.name, e.id
+        """, [tuple(week_models.ids)])
+
+        try:
+            key = None
+            row = None
+            while True:
+                self.env.cr.execute("FETCH FORWARD %s FROM planning_report_rows", [itersize])
+                batch = self.env.cr.fetchall()
+                if not batch:
+                    break
+                for project_id, project, employee_id, employee, week_id, workload in batch:
+                    if (project_id, employee_id) != key:
+                        if row:
+                            yield row
+                        key = (project_id, employee_id)
+                        row = {'project': project,
+                               'employee': employee,
+                               'workloads': [0] * length,
+                               'total': 0}
+                    row['workloads'][week_index[week_id]] += workload
+                    row['total'] += workload
+            if row:
+                yield row
+        except GeneratorExit:
+            # the export was stopped before all rows were read
+            self.env.cr.execute("CLOSE planning_report_rows")
+            raise
+        self.env.cr.execute("CLOSE planning_report_rows")
+
+    @api.model
+    def iter_export_lines(self, weeks):
+        """
+        Yields the lines of the exported report: the header, the rows of iter_workload_rows and the total.
+
+        :param weeks: the week-strings of the time span, in chronological order
+        :return: generator of lists of cell values
+        """
+        yield ['Project', 'Employee'] + weeks + ['Total']
+
+        totals = [0] * len(weeks)
+        for row in self.iter_workload_rows(weeks):
+            for i, workload in enumerate(row['workloads']):
+                totals[i] += workload
+            yield [row['project'], row['employee']] + row['workloads'] + [row['total']]
+
+        yield ['', 'Total'] + totals + [sum(totals)]
+
+    @api.model
+    def iter_csv(self, weeks):
+        """
+        Yields the exported report as csv file, one encoded line at a time.
+        Used to stream the download and to write the file of a background job.
+
+        :param weeks: the week-strings of the time span, in chronological order
+        :return: generator of the utf-8 encoded lines of the csv file
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for line in self.iter_export_lines(weeks):
+            writer.writerow(line)
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+
+    @api.model
+    def write_export(self, weeks, export_format, file):
         """
-        Checks whether the data in a week_array is relevant for the report
-        (if there is a workload != 0)
+        Writes the exported report line by line to a file.
+        The xlsx file is written with the constant_memory option of xlsxwriter,
+        so only one line is kept in memory.
 
-        :return: boolean, indicating whether the data is relevant or not
+        :param weeks: the week-strings of the time span, in chronological order
+        :param export_format: 'csv' or 'xlsx'
+        :param file: the binary file object the report is written to
+        :raises:
+            :exception UserError: if the xlsx format is requested and xlsxwriter isn't installed
         """
-        for week in week_array:
-            if week['workload'] != 0:
-                return True
+        if export_format == 'csv':
+            for line in self.iter_csv(weeks):
+                file.write(line)
+            return
 
-        return False
+        if not xlsxwriter:
+            raise exceptions.UserError("The python library xlsxwriter is required to export the report as xlsx")
+        workbook = xlsxwriter.Workbook(file, {'constant_memory': True})
+        worksheet = workbook.add_worksheet('Resource Planning')
+        bold = workbook.add_format({'bold': True})
+        for row_index, line in enumerate(self.iter_export_lines(weeks)):
+            worksheet.write_row(row_index, 0, line, bold if row_index == 0 else None)
+        workbook.close()
@@ -12,13 +12,38 @@ class ReportWizard(models.TransientModel):
 
     start_week = fields.Many2one('week.model', 'Start Week', required=True)
     end_week = fields.Many2one('week.model', 'End Week', required=True)
+    export_format = fields.Selection([('pdf', 'PDF'), ('csv', 'CSV'), ('xlsx', 'Excel (XLSX)')],
+                                     string='Format', required=True, default='pdf')
+    in_background = fields.Boolean(string='Generate in Background', default=False)
 
     def get_report(self):
         """
         Called when the user pushes the get-report button in the UI.
         Computes data and passes it on.
+        The CSV and XLSX exports are streamed by the export controller.
+        If in_background is set, a job is created instead and the report is generated by the scheduled action.
 
         """
+        if self.in_background:
+            job = self.env['resource.planning.report.job'].create({
+                'start_week': self.start_week.id,
+                'end_week': self.end_week.id,
+                'export_format': self.export_format,
+            })
+            return {
+                'type': 'ir.actions.act_window',
+                'res_model': job._name,
+                'view_mode': 'form',
+                'res_id': job.id,
+                'target': 'current',
+            }
+
+        if self.export_format in ('csv', 'xlsx'):
+            return {
+                'type': 'ir.actions.act_url',
+                'url': '/resource_planning_report/export/%s/%s' % (self.id, self.export_format),
+                'target': 'self',
+            }
 
         # Calculate time span
         weeks = self.get_weeks()
@@ -43,47 +68,16 @@ class ReportWizard(models.TransientModel):
             :exception ValidationError
         """
 
-        if self.end_week.year < self.start_week.year:
-            raise exceptions.ValidationError("Start week must be before end week")
-        elif self.start_week.year == self.end_week.year and self.start_week.week_num > self.end_week.week_num:
+        if self.filtered(lambda wizard: wizard.start_week.yearweek > wizard.end_week.yearweek):
             raise exceptions.ValidationError("Start week must be before end week")
 
     def get_weeks(self):
         """
         Calculates timespan according to the user input for start_week and end_week
+        The weeks are searched by their yearweek, so they are already in chronological order.
         :return: an array of week_string
         """
-        start = self.start_week
-        end = self.end_week
-        weeks = []
-        week_models = self.env['week.model'].search([])
-
-        for week in week_models:
-            if (week.week_string >= start.week_string) & (week.week_string <= end.week_string):
-                weeks.append(week.week_string)
-
-        weeks = self.order_weeks(weeks)
-        return weeks
-
-    def order_weeks(self, weeks):
-        """
-        Orders the week-strings chronologically for the report.
-
-        :param weeks: the weeks defining the timespan for the report
-        :return: the same week-string in chronological order
-        """
-        length = len(weeks)
-        l = length
-        result = []
-        while len(result) != length:
-            temp = weeks[0]
-            index = 0
-            for i in range(l):
-                if weeks[i] < temp:
-                    temp = weeks[i]
-                    index = i
-            result.append(temp)
-            del(weeks[index])
-            l = l-1
+        week_models = self.env['week.model'].search([('yearweek', '>=', self.start_week.yearweek),
+                                                     ('yearweek', '<=', self.end_week.yearweek)])
 
-        return result
+        return week_models.mapped('week_string')
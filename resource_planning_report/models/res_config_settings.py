@@ -0,0 +1,46 @@
+from odoo import fields, models, api
+
+
+class ResConfigSettings(models.TransientModel):
+    """
+    Extends res.config.settings of the resource_planning module by the settings of the report.
+    The variable report_job_workers defines how many reports are generated in the background at the same time.
+    The variable report_pdf_workers defines how many wkhtmltopdf processes render the sections of a report.
+    """
+
+    _inherit = 'res.config.settings'
+
+    report_job_workers = fields.Integer(string="Report Workers")
+    report_pdf_workers = fields.Integer(string="PDF Workers")
+
+    def set_values(self):
+        """
+        Stores the parameters in the ir.config_parameter model where they can be easily accessed.
+
+        :return: the created ResConfigSettings Object
+        """
+        res = super(ResConfigSettings, self).set_values()
+        self.env['ir.config_parameter'].set_param('resource_planning_report.report_job_workers',
+                                                  self.report_job_workers)
+        self.env['ir.config_parameter'].set_param('resource_planning_report.report_pdf_workers',
+                                                  self.report_pdf_workers)
+
+        return res
+
+    @api.model
+    def get_values(self):
+        """
+        Fetches the parameters from the ir.config_parameter model and creates the ResConfigSettings model.
+
+        :return: the ResConfigSettings Object
+        """
+
+        res = super(ResConfigSettings, self).get_values()
+        ICPSudo = self.env['ir.config_parameter'].sudo()
+        report_job_workers = ICPSudo.get_param('resource_planning_report.report_job_workers', 1)
+        report_pdf_workers = ICPSudo.get_param('resource_planning_report.report_pdf_workers', 1)
+        res.update(
+            report_job_workers=int(report_job_workers),
+            report_pdf_workers=int(report_pdf_workers)
+        )
+        return res
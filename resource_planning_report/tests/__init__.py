@@ -1,3 +1,4 @@
 from . import test_report_view
 from . import test_report_wizard
-
+from . import test_report_job
+from . import test_ir_actions_report
@@ -0,0 +1,21 @@
+from odoo.tests import common
+
+
+class TestIrActionsReport(common.TransactionCase):
+    """
+    Test class for IrActionsReport.
+
+    The parallel rendering cannot be tested as no pdf is rendered in tests.
+    """
+
+    def test_split_bodies(self):
+        """
+        Tests whether split_bodies splits the sections into consecutive parts of about the same size.
+
+        """
+        model = self.env['ir.actions.report']
+        bodies = ['b1', 'b2', 'b3', 'b4', 'b5']
+
+        self.assertEqual(model.split_bodies(bodies, 2), [['b1', 'b2', 'b3'], ['b4', 'b5']], 'Parts not correct')
+        self.assertEqual(model.split_bodies(bodies, 1), [bodies], 'Should be one part')
+        self.assertEqual(model.split_bodies(['b1', 'b2'], 4), [['b1'], ['b2']], 'Should not create empty parts')
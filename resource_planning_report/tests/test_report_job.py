@@ -0,0 +1,110 @@
+import base64
+import datetime
+
+from odoo import fields
+from odoo.tests import common
+
+
+class TestReportJob(common.TransactionCase):
+    """
+    Test class for ReportJob.
+
+    Methods run_jobs and run_worker cannot be tested as they commit the processed jobs.
+    """
+
+    def test_get_report_in_background(self):
+        """
+        Tests whether get_report creates a pending job if the report is generated in the background.
+
+        """
+        week = self.env['week.model'].create({'year': 1990, 'week_num': 20})
+        values = {'start_week': week.id,
+                  'end_week': week.id,
+                  'export_format': 'csv',
+                  'in_background': True}
+        wizard = self.env['resource.planning.report.wizard'].create(values)
+
+        action = wizard.get_report()
+        job = self.env['resource.planning.report.job'].browse(action['res_id'])
+
+        self.assertEqual(action['res_model'], 'resource.planning.report.job', 'Should open the job')
+        self.assertEqual(job.state, 'pending', 'Job should be pending')
+        self.assertEqual(job.user_id, self.env.user, 'Job should belong to the user')
+        self.assertEqual(job.name, 'Resource Planning Report 1990, W20 - 1990, W20', 'Name not correct')
+
+    def test_run_job_csv(self):
+        """
+        Tests whether run_job stores the generated csv file as attachment of the job.
+
+        If this test fails, there are weekly_resource records planned during the tested timespan (1990, W19-20)
+        in your database.
+
+        """
+        project = self.env['project.project'].create({'name': 'p1'})
+        employee = self.env['hr.employee'].create({'name': 'e1'})
+        self.env['resource.model'].create({'project': project.id,
+                                           'employee': employee.id,
+                                           'base_workload': 50,
+                                           'start_date': '1990-05-07 13:42:07',
+                                           'end_date': '1990-05-13 13:42:07'})
+        start_week = self.env['week.model'].search([['week_string', '=', '1990, W19']])
+        end_week = self.env['week.model'].create({'year': 1990, 'week_num': 20})
+
+        job = self.env['resource.planning.report.job'].create({'start_week': start_week.id,
+                                                               'end_week': end_week.id,
+                                                               'export_format': 'csv'})
+        job.run_job()
+
+        self.assertEqual(job.state, 'done', 'Job should be done')
+        self.assertEqual(job.attachment_id.name, 'Resource Planning Report 1990, W19 - 1990, W20.csv',
+                         'Attachment name not correct')
+        self.assertEqual(base64.b64decode(job.attachment_id.datas).decode('utf-8').splitlines(),
+                         ['Project,Employee,"1990, W19","1990, W20",Total',
+                          'p1,e1,50,0,50',
+                          ',Total,50,0,50'], 'Csv file not correct')
+
+    def create_job(self, values=None):
+        """
+        Creates a pending job used for testing
+
+        :return: the created job
+        """
+        week = self.env['week.model'].create_missing_weeks([{'year': 1990, 'week_num': 20}])
+        job_values = {'start_week': week.id,
+                      'end_week': week.id,
+                      'export_format': 'csv'}
+        job_values.update(values or {})
+        return self.env['resource.planning.report.job'].create(job_values)
+
+    def test_claim_job(self):
+        """
+        Tests whether claim_job claims the oldest pending job and counts the attempt.
+
+        If this test fails, there are pending jobs in your database.
+
+        """
+        job = self.create_job()
+
+        claimed = self.env['resource.planning.report.job'].claim_job()
+
+        self.assertEqual(claimed, job, 'Should claim the pending job')
+        self.assertEqual(job.state, 'running', 'Job should be running')
+        self.assertEqual(job.attempts, 1, 'Attempt should be counted')
+        self.assertTrue(job.started_at, 'Start should be stored')
+
+    def test_requeue_interrupted_jobs(self):
+        """
+        Tests whether requeue_interrupted_jobs sets interrupted jobs back to pending
+        and marks them as failed after MAX_ATTEMPTS attempts.
+
+        """
+        started_at = fields.Datetime.now() - datetime.timedelta(days=1)
+        interrupted = self.create_job({'state': 'running', 'attempts': 1, 'started_at': started_at})
+        exhausted = self.create_job({'state': 'running', 'attempts': 3, 'started_at': started_at})
+        running = self.create_job({'state': 'running', 'attempts': 1, 'started_at': fields.Datetime.now()})
+
+        self.env['resource.planning.report.job'].requeue_interrupted_jobs()
+
+        self.assertEqual(interrupted.state, 'pending', 'Interrupted job should be pending again')
+        self.assertEqual(exhausted.state, 'failed', 'Job should fail after 3 attempts')
+        self.assertEqual(running.state, 'running', 'Running job should not be touched')
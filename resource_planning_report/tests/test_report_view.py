@@ -1,3 +1,4 @@
+from odoo import exceptions
 from odoo.tests import common
 
 
@@ -8,87 +9,6 @@ class TestReportView(common.TransactionCase):
 
     """
 
-    def test_is_relevant_1(self):
-        """
-        Tests, whether a week_array of relevant week_data's is considered relevant.
-
-        """
-        model = self.env['report.resource_planning_report.planning_report_view']
-        week_array = []
-        week_data_1 = {'week': '2020, W20',
-                       'workload': 20}
-        week_data_2 = {'week': '2020, W21',
-                       'workload': 20}
-        week_data_3 = {'week': '2020, W22',
-                       'workload': 20}
-        week_array.append(week_data_1)
-        week_array.append(week_data_2)
-        week_array.append(week_data_3)
-
-        self.assertTrue(model.is_relevant(week_array), 'week_array should be relevant')
-
-    def test_is_relevant_2(self):
-        """
-        Tests, whether a week_array of mainly relevant week_data's is considered relevant.
-
-        """
-
-        model = self.env['report.resource_planning_report.planning_report_view']
-        week_array = []
-        week_data_1 = {'week': '2020, W20',
-                       'workload': 0}
-        week_data_2 = {'week': '2020, W21',
-                       'workload': 20}
-        week_data_3 = {'week': '2020, W22',
-                       'workload': 20}
-        week_array.append(week_data_1)
-        week_array.append(week_data_2)
-        week_array.append(week_data_3)
-
-        self.assertTrue(model.is_relevant(week_array), 'week_array should be relevant')
-
-    def test_is_relevant_3(self):
-        """
-        Tests, whether a week_array with only one relevant week_data is considered relevant.
-
-        """
-
-        model = self.env['report.resource_planning_report.planning_report_view']
-        week_array = []
-        week_data_1 = {'week': '2020, W20',
-                       'workload': 0}
-        week_data_2 = {'week': '2020, W21',
-                       'workload': 0}
-        week_data_3 = {'week': '2020, W22',
-                       'workload': 20}
-        week_array.append(week_data_1)
-        week_array.append(week_data_2)
-        week_array.append(week_data_3)
-
-        self.assertTrue(model.is_relevant(week_array), 'week_array should be relevant')
-
-    def test_is_not_relevant(self):
-        """
-        Tests, whether a week_array with only irrelevant week_data's is considered irrelevant.
-
-        """
-
-        model = self.env['report.resource_planning_report.planning_report_view']
-        week_array = []
-        week_data_1 = {'week': '2020, W20',
-                       'workload': 0}
-        week_data_2 = {'week': '2020, W21',
-                       'workload': 0}
-        week_data_3 = {'week': '2020, W22',
-                       'workload': 0}
-        week_array.append(week_data_1)
-        week_array.append(week_data_2)
-        week_array.append(week_data_3)
-
-        self.assertFalse(model.is_relevant(week_array), 'week_array should be relevant')
-
-    # ---------------------------------------------------------------------------------------------------------------- #
-
     def test_get_report_values_1(self):
         """
         Tests whether _get_report_values creates the correct report data.
@@ -116,17 +36,13 @@ class TestReportView(common.TransactionCase):
         self.assertEqual(docs['doc_ids'], 1, 'Id should be 1')
         self.assertEqual(docs['doc_model'], 'resource.planning.report.wizard', 'Model should be report wizard')
         self.assertEqual(docs['weeks'], ['1990, W19', '1990, W20', '1990, W21'], 'Weeks should be 1990 W19 - W21')
-        self.assertEqual(docs['docs'],
-                         [{'project': 'p1',
-                           'employee': 'e1',
-                           'weekly_data': [{'week': '1990, W19', 'workload': 50},
-                                           {'week': '1990, W20', 'workload': 0},
-                                           {'week': '1990, W21', 'workload': 0}]},
-                          {'project': ' ',
-                           'employee': 'Total',
-                           'weekly_data': [{'week': '1990, W19', 'workload': 50},
-                                           {'week': '1990, W20', 'workload': 0},
-                                           {'week': '1990, W21', 'workload': 0}]}], 'Report data not correct')
+        self.assertEqual(docs['docs'], [{'project': 'p1',
+                                         'employee': 'e1',
+                                         'workloads': [50, 0, 0],
+                                         'total': 50}], 'Report data not correct')
+        self.assertEqual(docs['chunks'], [docs['docs']], 'Chunks not correct')
+        self.assertEqual(docs['totals'], [50, 0, 0], 'Totals per week not correct')
+        self.assertEqual(docs['total'], 50, 'Total not correct')
 
     def test_get_report_values_2(self):
         """
@@ -157,9 +73,128 @@ class TestReportView(common.TransactionCase):
         self.assertEqual(docs['doc_ids'], 1, 'Id should be 1')
         self.assertEqual(docs['doc_model'], 'resource.planning.report.wizard', 'Model should be report wizard')
         self.assertEqual(docs['weeks'], ['1990, W19', '1990, W20', '1990, W21'], 'Weeks should be 1990 W19 - W21')
-        self.assertEqual(docs['docs'], [{'project': ' ',
-                                         'employee': 'Total',
-                                         'weekly_data': [{'week': '1990, W19', 'workload': 0},
-                                                         {'week': '1990, W20', 'workload': 0},
-                                                         {'week': '1990, W21', 'workload': 0}]}],
-                         'Report data not correct')
+        self.assertEqual(docs['docs'], [], 'Report data not correct')
+        self.assertEqual(docs['totals'], [0, 0, 0], 'Totals per week not correct')
+        self.assertEqual(docs['total'], 0, 'Total not correct')
+
+    def test_get_report_values_3(self):
+        """
+        Tests whether _get_report_values creates one row per project and employee with a workload in the
+        tested timespan and leaves out the ones without.
+
+        If this test fails, there are weekly_resource records planned during the tested timespan (1990, W19-21)
+        in your database.
+
+        """
+        project1 = self.env['project.project'].create({'name': 'p1'})
+        project2 = self.env['project.project'].create({'name': 'p2'})
+        employee1 = self.env['hr.employee'].create({'name': 'e1'})
+        employee2 = self.env['hr.employee'].create({'name': 'e2'})
+        self.env['resource.model'].create([{'project': project2.id,
+                                            'employee': employee1.id,
+                                            'base_workload': 20,
+                                            'start_date': '1990-05-14 13:42:07',
+                                            'end_date': '1990-05-27 13:42:07'},
+                                           {'project': project1.id,
+                                            'employee': employee2.id,
+                                            'base_workload': 50,
+                                            'start_date': '1990-05-07 13:42:07',
+                                            'end_date': '1990-05-13 13:42:07'},
+                                           {'project': project1.id,
+                                            'employee': employee1.id,
+                                            'base_workload': 30,
+                                            'start_date': '1990-06-04 13:42:07',
+                                            'end_date': '1990-06-08 13:42:07'}])
+
+        data = {'model': 'resource.planning.report.wizard',
+                'ids': 1,
+                'form': {
+                    'weeks': ['1990, W19', '1990, W20', '1990, W21']
+                }}
+        docs = self.env['report.resource_planning_report.planning_report_view']._get_report_values(self, data)
+
+        self.assertEqual(docs['docs'], [{'project': 'p1',
+                                         'employee': 'e2',
+                                         'workloads': [50, 0, 0],
+                                         'total': 50},
+                                        {'project': 'p2',
+                                         'employee': 'e1',
+                                         'workloads': [0, 20, 20],
+                                         'total': 40}], 'Report data not correct')
+        self.assertEqual(docs['totals'], [50, 20, 20], 'Totals per week not correct')
+        self.assertEqual(docs['total'], 90, 'Total not correct')
+
+    def test_iter_workload_rows(self):
+        """
+        Tests whether iter_workload_rows yields the same rows as _get_report_values.
+
+        If this test fails, there are weekly_resource records planned during the tested timespan (1990, W19-21)
+        in your database.
+
+        """
+        project1 = self.env['project.project'].create({'name': 'p1'})
+        project2 = self.env['project.project'].create({'name': 'p2'})
+        employee = self.env['hr.employee'].create({'name': 'e1'})
+        self.env['resource.model'].create([{'project': project2.id,
+                                            'employee': employee.id,
+                                            'base_workload': 20,
+                                            'start_date': '1990-05-14 13:42:07',
+                                            'end_date': '1990-05-27 13:42:07'},
+                                           {'project': project1.id,
+                                            'employee': employee.id,
+                                            'base_workload': 50,
+                                            'start_date': '1990-05-07 13:42:07',
+                                            'end_date': '1990-05-13 13:42:07'}])
+
+        weeks = ['1990, W19', '1990, W20', '1990, W21']
+        model = self.env['report.resource_planning_report.planning_report_view']
+        data = {'model': 'resource.planning.report.wizard',
+                'ids': 1,
+                'form': {
+                    'weeks': weeks
+                }}
+
+        rows = list(model.iter_workload_rows(weeks, itersize=1))
+
+        self.assertEqual(rows, [{'project': 'p1',
+                                 'employee': 'e1',
+                                 'workloads': [50, 0, 0],
+                                 'total': 50},
+                                {'project': 'p2',
+                                 'employee': 'e1',
+                                 'workloads': [0, 20, 20],
+                                 'total': 40}], 'Rows not correct')
+        self.assertEqual(rows, model._get_report_values(self, data)['docs'], 'Rows should be the same as the report')
+
+    def test_iter_workload_rows_access(self):
+        """
+        Tests whether iter_workload_rows is refused to users who may not read the weekly workloads.
+
+        """
+        user = self.env['res.users'].create({'name': 'u1',
+                                             'login': 'u1',
+                                             'groups_id': [(6, 0, [self.env.ref('base.group_user').id])]})
+        model = self.env['report.resource_planning_report.planning_report_view'].with_user(user)
+
+        with self.assertRaises(exceptions.AccessError):
+            list(model.iter_workload_rows(['1990, W19']))
+
+    def test_split_into_chunks(self):
+        """
+        Tests whether split_into_chunks keeps the rows of a project together if they fit into a chunk
+        and splits them otherwise.
+
+        """
+        model = self.env['report.resource_planning_report.planning_report_view']
+        docs = [{'project': 'p1', 'employee': 'e1'},
+                {'project': 'p1', 'employee': 'e2'},
+                {'project': 'p2', 'employee': 'e1'},
+                {'project': 'p3', 'employee': 'e1'},
+                {'project': 'p3', 'employee': 'e2'},
+                {'project': 'p3', 'employee': 'e3'},
+                {'project': 'p3', 'employee': 'e4'}]
+
+        chunks = model.split_into_chunks(docs, size=3)
+
+        self.assertEqual(chunks, [docs[0:3], docs[3:6], docs[6:7]], 'Chunks not correct')
+        self.assertEqual(model.split_into_chunks([], size=3), [], 'Should not create empty chunks')
@@ -63,36 +63,38 @@ class TestReportWizard(common.TransactionCase):
         self.assertFalse('1990, W19' in wizard.get_weeks(), '1990 W19 should not be in result')
         self.assertFalse('1990, W21' in wizard.get_weeks(), '1990 W21 should not be in result')
 
-    # ---------------------------------------------------------------------------------------------------------------- #
-    def test_order_weeks_1(self):
+    def test_get_weeks_over_year_bound(self):
         """
-        Tests whether week-strings are ordered correctly
+        Tests whether get_weeks returns the weeks in chronological order over new year.
+
         """
+        week1 = self.env['week.model'].create({'year': 1990, 'week_num': 52})
+        self.env['week.model'].create({'year': 1991, 'week_num': 2})
+        week2 = self.env['week.model'].create({'year': 1991, 'week_num': 1})
+
+        values = {'start_week': week1.id,
+                  'end_week': week2.id}
+        wizard = self.env['resource.planning.report.wizard'].create(values)
 
-        weeks = ['2020, W19', '2020, W17', '2020, W18']
-        self.assertEqual(['2020, W17', '2020, W18', '2020, W19'],
-                         self.env['resource.planning.report.wizard'].order_weeks(weeks),
-                         'Weeks are not ordered correctly')
+        self.assertEqual(wizard.get_weeks(), ['1990, W52', '1991, W01'], 'Weeks should be 1990 W52 - 1991 W01')
 
-    def test_order_weeks_2(self):
+    def test_get_report_csv(self):
         """
-        Tests whether week-strings in correct order are not reordered
+        Tests whether get_report opens the export controller if the CSV format is chosen.
+
         """
+        week = self.env['week.model'].create({'year': 1990, 'week_num': 20})
+        values = {'start_week': week.id,
+                  'end_week': week.id,
+                  'export_format': 'csv'}
+        wizard = self.env['resource.planning.report.wizard'].create(values)
 
-        weeks = ['2020, W19', '2020, W20', '2020, W21']
-        self.assertEqual(['2020, W19', '2020, W20', '2020, W21'],
-                         self.env['resource.planning.report.wizard'].order_weeks(weeks),
-                         'Weeks are not ordered correctly')
+        action = wizard.get_report()
 
-    def test_order_weeks_3(self):
-        """
-        Tests whether week-strings are ordered correctly with a timespan over new year
-        """
+        self.assertEqual(action['type'], 'ir.actions.act_url', 'Should open an url')
+        self.assertEqual(action['url'], '/resource_planning_report/export/%s/csv' % wizard.id,
+                         'Should open the csv export')
 
-        weeks = ['2020, W01', '2020, W02', '2019, W52']
-        self.assertEqual(['2019, W52', '2020, W01', '2020, W02'],
-                         self.env['resource.planning.report.wizard'].order_weeks(weeks),
-                         'Weeks are not ordered correctly')
 # -----------------------------------------------------------------------------------------------------------------------
 
     def test_start_week_before_end_week_wrong_year(self):